@@ -1,3 +1,16 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import TopicQuizStats, UserQuizStats
+
+
+@admin.register(UserQuizStats)
+class UserQuizStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "attempts", "accuracy", "last_attempt_at", "updated_at")
+    search_fields = ("user__email",)
+    raw_id_fields = ("user",)
+
+
+@admin.register(TopicQuizStats)
+class TopicQuizStatsAdmin(admin.ModelAdmin):
+    list_display = ("topic", "attempts", "users", "accuracy", "updated_at")
+    search_fields = ("topic",)
@@ -0,0 +1,169 @@
+"""
+Rollups of quiz attempts into per-user and per-topic statistics. Only the
+users and topics with attempts not yet rolled up are rebuilt, each with a
+few grouped queries, and written back with one upsert per table.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+
+from quiz.models import QuizAnswer, QuizAttempt
+
+from ..models import TopicQuizStats, UserQuizStats
+
+ATTEMPT_TOTALS = {
+    "attempts": Count("id"),
+    "questions": Sum("total_questions"),
+    "correct": Sum("correct"),
+    "mean_proficiency": Avg("proficiency_score"),
+    "total_seconds": Sum("total_seconds"),
+    "first_attempt_at": Min("created_at"),
+    "last_attempt_at": Max("created_at"),
+}
+
+
+def _accuracy(correct, total) -> float:
+    return round(correct / total, 3) if total else 0
+
+
+def _breakdowns(answers, group: str, field: str):
+    """
+    {group value: {field value: {"total", "correct", "accuracy"}}} over
+    the answers.
+    """
+    rows = answers.values(group, field).annotate(
+        total=Count("id"), correct=Count("id", filter=Q(is_correct=True))
+    )
+    breakdowns = defaultdict(dict)
+    for row in rows:
+        breakdowns[row[group]][row[field]] = {
+            "total": row["total"],
+            "correct": row["correct"],
+            "accuracy": _accuracy(row["correct"], row["total"]),
+        }
+    return breakdowns
+
+
+def rollup_users(user_ids) -> int:
+    totals = (
+        QuizAttempt.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(**ATTEMPT_TOTALS)
+    )
+    answers = QuizAnswer.objects.filter(attempt__user_id__in=user_ids)
+    by_type = _breakdowns(answers, "attempt__user_id", "type")
+    by_difficulty = _breakdowns(answers, "attempt__user_id", "difficulty")
+
+    stats = [
+        UserQuizStats(
+            user_id=row["user_id"],
+            attempts=row["attempts"],
+            questions=row["questions"],
+            correct=row["correct"],
+            accuracy=_accuracy(row["correct"], row["questions"]),
+            mean_proficiency=round(row["mean_proficiency"], 3),
+            total_seconds=round(row["total_seconds"], 1),
+            by_type=by_type[row["user_id"]],
+            by_difficulty=by_difficulty[row["user_id"]],
+            first_attempt_at=row["first_attempt_at"],
+            last_attempt_at=row["last_attempt_at"],
+        )
+        for row in totals
+    ]
+    UserQuizStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=[
+            "attempts",
+            "questions",
+            "correct",
+            "accuracy",
+            "mean_proficiency",
+            "total_seconds",
+            "by_type",
+            "by_difficulty",
+            "first_attempt_at",
+            "last_attempt_at",
+            "updated_at",
+        ],
+    )
+    return len(stats)
+
+
+def rollup_topics(topics) -> int:
+    totals = (
+        QuizAttempt.objects.filter(topic__in=topics)
+        .values("topic")
+        .annotate(users=Count("user", distinct=True), **ATTEMPT_TOTALS)
+    )
+    by_difficulty = _breakdowns(
+        QuizAnswer.objects.filter(attempt__topic__in=topics),
+        "attempt__topic",
+        "difficulty",
+    )
+
+    stats = [
+        TopicQuizStats(
+            topic=row["topic"],
+            attempts=row["attempts"],
+            users=row["users"],
+            questions=row["questions"],
+            correct=row["correct"],
+            accuracy=_accuracy(row["correct"], row["questions"]),
+            mean_proficiency=round(row["mean_proficiency"], 3),
+            mean_seconds_per_question=(
+                round(row["total_seconds"] / row["questions"], 1)
+                if row["questions"]
+                else 0
+            ),
+            by_difficulty=by_difficulty[row["topic"]],
+            last_attempt_at=row["last_attempt_at"],
+        )
+        for row in totals
+    ]
+    TopicQuizStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["topic"],
+        update_fields=[
+            "attempts",
+            "users",
+            "questions",
+            "correct",
+            "accuracy",
+            "mean_proficiency",
+            "mean_seconds_per_question",
+            "by_difficulty",
+            "last_attempt_at",
+            "updated_at",
+        ],
+    )
+    return len(stats)
+
+
+def rollup_pending_attempts() -> int:
+    """
+    Roll up attempts recorded since the last run, in batches of
+    ANALYTICS_ROLLUP_BATCH_SIZE. Returns the number of attempts rolled up.
+    """
+    rolled_up = 0
+    while True:
+        pending = list(
+            QuizAttempt.objects.filter(rolled_up=False)
+            .order_by("created_at")
+            .values_list("id", "user_id", "topic")[: settings.ANALYTICS_ROLLUP_BATCH_SIZE]
+        )
+        if not pending:
+            return rolled_up
+
+        # Statistics are rebuilt from all of each user's and topic's
+        # attempts, so they stay exact however the batches fall.
+        rollup_users({user_id for _, user_id, _ in pending if user_id})
+        rollup_topics({topic for _, _, topic in pending})
+        QuizAttempt.objects.filter(id__in=[pk for pk, _, _ in pending]).update(
+            rolled_up=True
+        )
+        rolled_up += len(pending)
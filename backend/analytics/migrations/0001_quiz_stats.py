@@ -0,0 +1,55 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicQuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=255, unique=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('questions', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('accuracy', models.FloatField(default=0)),
+                ('mean_proficiency', models.FloatField(default=0)),
+                ('mean_seconds_per_question', models.FloatField(default=0)),
+                ('by_difficulty', models.JSONField(blank=True, default=dict)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-attempts'], name='analytics_t_attempt_2c448a_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserQuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('questions', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('accuracy', models.FloatField(default=0)),
+                ('mean_proficiency', models.FloatField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('by_type', models.JSONField(blank=True, default=dict)),
+                ('by_difficulty', models.JSONField(blank=True, default=dict)),
+                ('first_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
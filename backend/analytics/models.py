@@ -1,3 +1,78 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class UserQuizStats(models.Model):
+    """
+    Quiz statistics of one user, rolled up from their attempts by
+    analytics.tasks.aggregate_quiz_stats.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="quiz_stats"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    questions = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0)
+    mean_proficiency = models.FloatField(default=0)
+    total_seconds = models.FloatField(default=0)
+    # {name: {"total", "correct", "accuracy"}} per question type and
+    # difficulty.
+    by_type = models.JSONField(default=dict, blank=True)
+    by_difficulty = models.JSONField(default=dict, blank=True)
+    first_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def to_dict(self):
+        return {
+            "attempts": self.attempts,
+            "questions": self.questions,
+            "correct": self.correct,
+            "accuracy": self.accuracy,
+            "mean_proficiency": self.mean_proficiency,
+            "total_seconds": self.total_seconds,
+            "by_type": self.by_type,
+            "by_difficulty": self.by_difficulty,
+            "first_attempt_at": self.first_attempt_at,
+            "last_attempt_at": self.last_attempt_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class TopicQuizStats(models.Model):
+    """
+    Quiz statistics of one topic across all users, rolled up with the
+    per-user statistics.
+    """
+
+    topic = models.CharField(max_length=255, unique=True)
+    attempts = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    questions = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0)
+    mean_proficiency = models.FloatField(default=0)
+    mean_seconds_per_question = models.FloatField(default=0)
+    by_difficulty = models.JSONField(default=dict, blank=True)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["-attempts"])]
+
+    def to_dict(self):
+        return {
+            "topic": self.topic,
+            "attempts": self.attempts,
+            "users": self.users,
+            "questions": self.questions,
+            "correct": self.correct,
+            "accuracy": self.accuracy,
+            "mean_proficiency": self.mean_proficiency,
+            "mean_seconds_per_question": self.mean_seconds_per_question,
+            "by_difficulty": self.by_difficulty,
+            "last_attempt_at": self.last_attempt_at,
+            "updated_at": self.updated_at,
+        }
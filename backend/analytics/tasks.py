@@ -0,0 +1,28 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from readme.profiling import profiled
+
+from .functionalities.rollups import rollup_pending_attempts
+
+ROLLUP_LOCK_KEY = "analytics-quiz-rollup-lock"
+
+
+@shared_task
+@profiled("aggregate_quiz_stats")
+def aggregate_quiz_stats():
+    """
+    Periodic rollup of new quiz attempts (see CELERY_BEAT_SCHEDULE).
+    Skipped while a previous run is still going.
+    """
+    if not cache.add(ROLLUP_LOCK_KEY, True, settings.ANALYTICS_ROLLUP_LOCK_SECONDS):
+        return
+    try:
+        rolled_up = rollup_pending_attempts()
+        if rolled_up:
+            logging.info("Rolled up %s quiz attempts", rolled_up)
+    finally:
+        cache.delete(ROLLUP_LOCK_KEY)
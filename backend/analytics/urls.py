@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("analytics/quiz/me/", views.user_quiz_stats, name="user-quiz-stats"),
+    path("analytics/quiz/topics/", views.topic_quiz_stats, name="topic-quiz-stats"),
+]
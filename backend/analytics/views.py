@@ -1,3 +1,49 @@
-from django.shortcuts import render
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from readme.profiling import profiled
+
+from .models import TopicQuizStats, UserQuizStats
+
+MAX_TOPICS = 100
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@profiled()
+def user_quiz_stats(request: HttpRequest):
+    """
+    The user's quiz statistics, as of the last rollup.
+    """
+    stats = UserQuizStats.objects.filter(user=request.user).first()
+    return Response({
+        "status": "success",
+        "data": (stats or UserQuizStats(user=request.user)).to_dict(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@profiled()
+def topic_quiz_stats(request: HttpRequest):
+    """
+    Quiz statistics per topic, most attempted first, as of the last
+    rollup. ?topic= narrows the list to one topic and ?limit= caps it.
+    """
+    topics = TopicQuizStats.objects.order_by("-attempts")
+    if request.query_params.get("topic"):
+        topics = topics.filter(topic=request.query_params["topic"])
+    try:
+        limit = min(int(request.query_params.get("limit", 20)), MAX_TOPICS)
+    except ValueError:
+        return Response({
+            "status": "error",
+            "message": "limit must be a number"
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "status": "success",
+        "data": [stats.to_dict() for stats in topics[:max(limit, 0)]],
+    }, status=status.HTTP_200_OK)
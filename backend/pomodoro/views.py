@@ -1,15 +1,42 @@
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import TimerState
 from .serializers import TimerStateSerializer
 
+
+def _timer_state(request):
+    # Read once per request and shared by the validators and the view.
+    if not hasattr(request, "_timer_state"):
+        request._timer_state = TimerState.objects.first()
+    return request._timer_state
+
+
+def timer_last_updated(request):
+    timer_state = _timer_state(request)
+    return timer_state.last_updated if timer_state else None
+
+
+def timer_etag(request):
+    last_updated = timer_last_updated(request)
+    return str(last_updated.timestamp()) if last_updated else None
+
+
 class TimerStateView(APIView):
+    @method_decorator(
+        condition(etag_func=timer_etag, last_modified_func=timer_last_updated)
+    )
     def get(self, request):
-        timer_state = TimerState.objects.first()
+        timer_state = _timer_state(request)
         if not timer_state:
             timer_state = TimerState.objects.create()
         serializer = TimerStateSerializer(timer_state)
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        # The state changes while the timer runs, so always revalidate.
+        patch_cache_control(response, no_cache=True)
+        return response
 
     def post(self, request):
         timer_state = TimerState.objects.first()
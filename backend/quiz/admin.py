@@ -1,3 +1,24 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import BankQuestion, QuizAnswer, QuizAttempt
+
+
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ("topic", "type", "difficulty", "source_key", "created_at")
+    list_filter = ("type", "difficulty")
+    search_fields = ("topic", "question", "source_key")
+
+
+class QuizAnswerInline(admin.TabularInline):
+    model = QuizAnswer
+    extra = 0
+
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ("topic", "user", "correct", "total_questions", "created_at")
+    list_filter = ("rolled_up",)
+    search_fields = ("topic", "user__email")
+    raw_id_fields = ("user",)
+    inlines = [QuizAnswerInline]
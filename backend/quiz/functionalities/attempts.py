@@ -0,0 +1,78 @@
+"""
+Persisted quiz attempts. Each scored submission is written as one attempt
+row and its answers in a single bulk insert.
+"""
+
+from django.db import IntegrityError, transaction
+
+from ..models import QuizAnswer, QuizAttempt
+
+
+def record_attempt(user, topic: str, scores: dict, token: str) -> QuizAttempt:
+    """
+    Store a scored quiz. A resubmission of the same results by the same
+    signed-in user returns the attempt already stored; anonymous attempts
+    cannot be told apart, so each is stored.
+    """
+    user = user if user is not None and user.is_authenticated else None
+    if user is not None:
+        existing = QuizAttempt.objects.filter(user=user, token=token).first()
+        if existing:
+            return existing
+
+    try:
+        return _create_attempt(user, topic, scores, token)
+    except IntegrityError:
+        # A concurrent resubmission stored it first.
+        return QuizAttempt.objects.get(user=user, token=token)
+
+
+def _create_attempt(user, topic: str, scores: dict, token: str) -> QuizAttempt:
+    summary = scores["summary"]
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(
+            user=user,
+            topic=topic[:255],
+            token=token,
+            total_questions=summary["total_questions"],
+            answered=summary["answered"],
+            correct=summary["correct"],
+            accuracy=summary["accuracy"],
+            proficiency_score=summary["proficiency_score"],
+            total_seconds=scores["timing"]["total_seconds"],
+        )
+        QuizAnswer.objects.bulk_create(
+            [
+                QuizAnswer(
+                    attempt=attempt,
+                    question_number=result["question_number"],
+                    question=result["question"],
+                    type=result["type"],
+                    difficulty=result["difficulty"],
+                    topic=str(result["topic"])[:255],
+                    selected_answer=(
+                        None
+                        if result["selected_answer"] is None
+                        else str(result["selected_answer"])
+                    ),
+                    correct_answer=str(result["correct_answer"]),
+                    answered=result["answered"],
+                    is_correct=result["is_correct"],
+                    time_taken=float(result["time_taken"]),
+                )
+                for result in scores["questions"]
+            ]
+        )
+    return attempt
+
+
+def save_narrative(token: str, narrative: dict):
+    QuizAttempt.objects.filter(token=token).update(narrative=narrative)
+
+
+def stored_narrative(token: str):
+    return (
+        QuizAttempt.objects.filter(token=token, narrative__isnull=False)
+        .values_list("narrative", flat=True)
+        .first()
+    )
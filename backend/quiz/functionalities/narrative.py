@@ -0,0 +1,79 @@
+"""
+On-demand LLM narrative for scored quizzes. Scoring a quiz stores the
+scores under a token; the narrative is generated in Celery only when a
+client asks for that token, and cached for repeat requests.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .attempts import save_narrative, stored_narrative
+
+
+def _submission_key(token: str) -> str:
+    return f"quiz-assessment:{token}"
+
+
+def _narrative_key(token: str) -> str:
+    return f"quiz-narrative:{token}"
+
+
+def save_submission(topic: str, scores: dict) -> str:
+    """
+    Keep the scores for a later narrative request and return its token.
+    Identical submissions share a token, and so a narrative.
+    """
+    payload = {"topic": topic, "questions": scores["questions"]}
+    token = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    cache.set(
+        _submission_key(token),
+        {"topic": topic, "scores": scores},
+        settings.QUIZ_NARRATIVE_CACHE_SECONDS,
+    )
+    return token
+
+
+def get_submission(token: str):
+    return cache.get(_submission_key(token))
+
+
+def request_narrative(token: str):
+    """
+    The narrative state for the token ({"status": "pending" | "ready" |
+    "failed", ...}), queueing its generation on first request. None if the
+    submission is unknown or has expired.
+    """
+    narrative = cache.get(_narrative_key(token)) or stored_narrative(token)
+    if narrative is not None:
+        return narrative
+    if get_submission(token) is None:
+        return None
+
+    pending = {"status": "pending"}
+    # Short-lived, so a task that is lost or dies is queued again by a later
+    # request instead of leaving the token pending.
+    if cache.add(_narrative_key(token), pending, settings.QUIZ_NARRATIVE_PENDING_SECONDS):
+        from ..tasks import generate_assessment_narrative
+
+        try:
+            generate_assessment_narrative.delay(token)
+        except Exception:
+            cache.delete(_narrative_key(token))
+            raise
+    return pending
+
+
+def store_narrative(token: str, narrative: dict, timeout: int = None):
+    if narrative["status"] == "ready":
+        # Also kept with the attempt, so it outlives the cache.
+        save_narrative(token, narrative)
+    cache.set(
+        _narrative_key(token),
+        narrative,
+        timeout or settings.QUIZ_NARRATIVE_CACHE_SECONDS,
+    )
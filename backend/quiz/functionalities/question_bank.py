@@ -0,0 +1,146 @@
+"""
+Question bank: generated questions are stored per source (document or
+topic) so later quizzes on the same source are drawn from the bank instead
+of waiting for the LLM. Sources whose bank runs low are refilled in Celery.
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import BankQuestion
+from .quiz_generation import (
+    OPTION_COUNTS,
+    QUIZ_BATCHES,
+    question_key,
+    validate_question,
+)
+from .scoring import DIFFICULTY_WEIGHTS
+
+# A quiz is served from the bank only once every type and difficulty holds
+# this many quizzes' worth of questions, so it differs from the quiz that
+# was just generated.
+MIN_BANKED_QUIZZES = 2
+
+
+def source_key(document=None, text: str = None) -> str:
+    if document is not None:
+        return f"doc:{document.content_hash}"
+    # Topics typed with different casing or spacing share a bank.
+    normalized = re.sub(r"\s+", " ", text.strip().lower())
+    return f"text:{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+
+
+def _bucket_ids(key: str):
+    buckets = defaultdict(list)
+    rows = BankQuestion.objects.filter(source_key=key).values_list(
+        "id", "type", "difficulty"
+    )
+    for pk, question_type, difficulty in rows:
+        buckets[(question_type, difficulty)].append(pk)
+    return buckets
+
+
+def serve_quiz(key: str):
+    """
+    A random quiz with the usual type and difficulty mix drawn from the
+    bank, or None if the bank cannot fill it yet.
+    """
+    buckets = _bucket_ids(key)
+    chosen = []
+    for question_type, difficulty, count in QUIZ_BATCHES:
+        ids = buckets.get((question_type, difficulty), [])
+        if len(ids) < count * MIN_BANKED_QUIZZES:
+            return None
+        chosen.extend(random.sample(ids, count))
+
+    questions = list(BankQuestion.objects.filter(id__in=chosen))
+    random.shuffle(questions)
+    return {
+        "topic": questions[0].topic,
+        "questions": [question.to_dict() for question in questions],
+    }
+
+
+def bank_is_low(key: str) -> bool:
+    """
+    True while any type and difficulty has fewer than QUIZ_BANK_STOCK
+    quizzes' worth of questions, so repeat quizzes would look alike.
+    """
+    buckets = _bucket_ids(key)
+    return any(
+        len(buckets.get((question_type, difficulty), []))
+        < count * settings.QUIZ_BANK_STOCK
+        for question_type, difficulty, count in QUIZ_BATCHES
+    )
+
+
+def banked_questions(key: str):
+    return list(
+        BankQuestion.objects.filter(source_key=key).values_list("question", flat=True)
+    )
+
+
+def add_to_bank(key: str, topic: str, questions) -> int:
+    """
+    Bank the questions the source does not have yet and return how many
+    were added.
+    """
+    # Only questions that fit the schema are banked; single-request quizzes
+    # are not validated when generated.
+    questions = [
+        validate_question(question, question.get("type"), question.get("difficulty"))
+        for question in questions
+        if isinstance(question, dict)
+        and question.get("type") in OPTION_COUNTS
+        and question.get("difficulty") in DIFFICULTY_WEIGHTS
+    ]
+    rows = {}
+    for question in questions:
+        if not question:
+            continue
+        question_hash = hashlib.sha256(
+            question_key(question).encode("utf-8")
+        ).hexdigest()
+        rows.setdefault(
+            question_hash,
+            BankQuestion(
+                source_key=key,
+                topic=(topic or "Quiz")[:255],
+                question=question["question"],
+                options=question["options"],
+                correct_answer=question["correctAnswer"],
+                explanation=question.get("explanation", ""),
+                type=question["type"],
+                difficulty=question["difficulty"],
+                question_hash=question_hash,
+            ),
+        )
+    banked = set(
+        BankQuestion.objects.filter(
+            source_key=key, question_hash__in=list(rows)
+        ).values_list("question_hash", flat=True)
+    )
+    new_rows = [row for question_hash, row in rows.items() if question_hash not in banked]
+    # A concurrent refill may bank the same question first; the unique
+    # constraint then skips it.
+    BankQuestion.objects.bulk_create(new_rows, ignore_conflicts=True)
+    return len(new_rows)
+
+
+def schedule_refill(key: str, document=None, text: str = None):
+    """
+    Queue a refill if the bank is low and none is queued for this source.
+    """
+    if not bank_is_low(key):
+        return
+    if cache.add(f"quiz-bank-refill:{key}", 1, settings.QUIZ_BANK_REFILL_LOCK_SECONDS):
+        from ..tasks import refill_question_bank
+
+        refill_question_bank.delay(
+            key, document_id=document.pk if document else None, text=text
+        )
@@ -1,18 +1,255 @@
+import logging
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import google.generativeai as genai
-import textract
 import ast
 import json
+from django.conf import settings
+from django.db import connections
+from readme.metrics import LLM_REQUEST_SECONDS, timed
+from video_generator.functionalities.documents import (
+    IMAGE_EXTENSIONS,
+    document_text,
+    generate_with_document,
+    remote_document,
+)
 
-def extract_text_from_document(doc_path: str):
-    text = textract.process(doc_path)
-    return text
+# Sub-requests of a parallel quiz: (type, difficulty, number of questions).
+# Together they make the same 10-question mix as a single request.
+QUIZ_BATCHES = (
+    ("mcq", "Easy", 2),
+    ("mcq", "Medium", 2),
+    ("mcq", "Hard", 1),
+    ("true-false", "Easy", 1),
+    ("true-false", "Medium", 1),
+    ("fill-in-the-blank", "Easy", 1),
+    ("fill-in-the-blank", "Medium", 1),
+    ("fill-in-the-blank", "Hard", 1),
+)
+OPTION_COUNTS = {"mcq": 4, "true-false": 2, "fill-in-the-blank": 4}
+TYPE_INSTRUCTIONS = {
+    "mcq": "multiple-choice questions with 4 options",
+    "true-false": 'true/false statements with exactly the options ["True", "False"]',
+    "fill-in-the-blank": "fill-in-the-blank sentences with a ______ where the answer goes and 4 options",
+}
 
 
-def generate_quiz_questions(file_path: str = None, text: str = None) -> str:
-    GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+def _model():
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+
+def _generate(model, llm_prompt: str, document=None, text: str = None, **kwargs):
+    """
+    Send the prompt with the quiz source: text inline, PDFs and images by
+    reference to their uploaded copy, other documents as extracted text.
+    """
+    if text:
+        return model.generate_content([f"{llm_prompt}\n\nContent:\n{text}"], **kwargs)
+
+    file_extension = document.extension
+    if file_extension == ".pdf" or file_extension in IMAGE_EXTENSIONS:
+        return generate_with_document(model, llm_prompt, document, **kwargs)
+    elif file_extension in [".doc", ".docx", ".pptx"]:
+        llm_prompt += f"\n\nContent:\n{document_text(document)}"
+        return model.generate_content([llm_prompt], **kwargs)
+    else:
+        raise ValueError("Unsupported file type.")
+
+
+def parse_json_response(response_text: str):
+    response_text = response_text.strip()
+
+    # Handle cases where the response might include markdown code blocks
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].strip()
+
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}")
+
+
+def validate_question(question, question_type: str, difficulty: str):
+    """
+    Return the question in the quiz schema, or None if it does not fit it:
+    non-empty text, the right number of distinct options for its type and a
+    correct answer that is one of them.
+    """
+    if not isinstance(question, dict):
+        return None
+    text = question.get("question")
+    options = question.get("options")
+    answer = question.get("correctAnswer")
+    if not isinstance(text, str) or not text.strip():
+        return None
+    if (
+        not isinstance(options, list)
+        or len(options) != OPTION_COUNTS[question_type]
+        or not all(isinstance(option, str) and option.strip() for option in options)
+        or len(set(options)) != len(options)
+    ):
+        return None
+    if answer not in options:
+        return None
+    if question_type == "fill-in-the-blank" and "__" not in text:
+        return None
+    return {
+        "question": text.strip(),
+        "options": options,
+        "correctAnswer": answer,
+        "explanation": str(question.get("explanation") or ""),
+        "type": question_type,
+        "difficulty": difficulty,
+    }
+
+
+def question_key(question: dict) -> str:
+    # Catches the same question asked by two batches with different
+    # punctuation or casing.
+    return re.sub(r"\W+", " ", question["question"].lower()).strip()
+
+
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="quiz_batch")
+def generate_question_batch(
+    model,
+    question_type: str,
+    difficulty: str,
+    count: int,
+    document=None,
+    text=None,
+    exclude=(),
+):
+    """
+    Ask for `count` questions of one type and difficulty, different from
+    the questions in `exclude`. Returns the topic and the questions that
+    pass validation.
+    """
+    llm_prompt = f"""Based on the provided content, write {count} {difficulty.lower()} {TYPE_INSTRUCTIONS[question_type]}.
+
+    Reply with a JSON object of this form:
+    {{
+      "topic": "Concise topic of the content",
+      "questions": [
+        {{
+          "question": "Question text",
+          "options": ["Option 1", "Option 2"],
+          "correctAnswer": "The correct option, copied exactly",
+          "explanation": "Detailed explanation of the answer"
+        }}
+      ]
+    }}
+
+    Ensure:
+    - If the content is only a topic, ask about that topic; otherwise ask about the content itself.
+    - The correct answers are accurate and based on the provided content.
+    - Every question tests a different fact.
+    """
+    if exclude:
+        llm_prompt += "\n    Do not repeat any of these existing questions:\n" + "\n".join(
+            f"    - {question}" for question in exclude
+        )
+    response = _generate(
+        model,
+        llm_prompt,
+        document=document,
+        text=text,
+        generation_config={"response_mime_type": "application/json"},
+    )
+    data = parse_json_response(response.text)
+    if not isinstance(data, dict) or not isinstance(data.get("questions"), list):
+        raise ValueError("Response missing required fields (topic or questions)")
+
+    questions = [
+        validate_question(question, question_type, difficulty)
+        for question in data["questions"][:count]
+    ]
+    return data.get("topic"), [question for question in questions if question]
+
+
+def _generate_question_batch_in_thread(*args, **kwargs):
+    # A batch may re-upload its document, which reads and saves it. Django
+    # only closes connections on the request thread, so close the ones
+    # this pool thread opened.
+    try:
+        return generate_question_batch(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+def iter_quiz_events(document=None, text: str = None, exclude=()):
+    """
+    Generate a quiz as concurrent per-type and per-difficulty requests,
+    yielding events as batches finish: the topic once, then each new
+    question, then "done" with the total. Duplicate questions, and those in
+    `exclude`, are dropped.
+    """
+    model = _model()
+    if document and document.extension in [".doc", ".docx", ".pptx"]:
+        # Extract once rather than in every batch.
+        text, document = document_text(document), None
+    elif document:
+        # Upload once; the batches then share the stored handle.
+        remote_document(document)
+
+    excluded = {question_key({"question": question}) for question in exclude}
+    seen = set()
+    topic = None
+    with ThreadPoolExecutor(max_workers=settings.QUIZ_BATCH_CONCURRENCY) as executor:
+        futures = [
+            executor.submit(
+                _generate_question_batch_in_thread,
+                model,
+                *batch,
+                document=document,
+                text=text,
+                exclude=exclude,
+            )
+            for batch in QUIZ_BATCHES
+        ]
+        for future in as_completed(futures):
+            try:
+                batch_topic, questions = future.result()
+            except Exception as e:
+                # The quiz is still useful without one batch.
+                logging.warning("Quiz batch failed: %s", e)
+                continue
+
+            if topic is None and batch_topic:
+                topic = batch_topic
+                yield {"event": "topic", "topic": topic}
+            for question in questions:
+                key = question_key(question)
+                if key in seen or key in excluded:
+                    continue
+                seen.add(key)
+                yield {"event": "question", "question": question}
+
+    if not seen:
+        raise ValueError("No valid questions were generated.")
+    yield {"event": "done", "total_questions": len(seen)}
+
+
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="quiz")
+def generate_quiz_questions(document=None, text: str = None) -> str:
+    if settings.QUIZ_PARALLEL_BATCHES:
+        quiz_data = {"topic": None, "questions": []}
+        for event in iter_quiz_events(document=document, text=text):
+            if event["event"] == "topic":
+                quiz_data["topic"] = event["topic"]
+            elif event["event"] == "question":
+                quiz_data["questions"].append(event["question"])
+        quiz_data["topic"] = quiz_data["topic"] or "Quiz"
+        return json.dumps(quiz_data)
+
+    return _generate_quiz_in_one_request(document=document, text=text)
+
+
+def _generate_quiz_in_one_request(document=None, text: str = None) -> str:
+    model = _model()
     llm_prompt = """You are provided with the following text:
     Based on this text, generate pool of 10 questions that assess based on this text..include a variety of question types:
     - Multiple-choice (MCQ)
@@ -47,50 +284,20 @@ def generate_quiz_questions(file_path: str = None, text: str = None) -> str:
     Reply with just the JSON response and nothing else.
     """
 
-    if text:
-        llm_prompt += f"\n\nContent:\n{text}"
-        response = model.generate_content([llm_prompt])
-    else:
-        file_extension = os.path.splitext(file_path)[-1].lower()
-
-        if file_extension == ".pdf":
-            pdf = genai.upload_file(file_path)
-            response = model.generate_content([llm_prompt, pdf])
-        elif file_extension in [".jpg", ".jpeg", ".png"]:
-            sample_image = genai.upload_file(file_path)
-            response = model.generate_content([llm_prompt, sample_image])
-        elif file_extension in [".doc", ".docx", ".pptx"]:
-            document_text = extract_text_from_document(file_path)
-            llm_prompt += f"\n\nContent:\n{document_text}"
-            response = model.generate_content([llm_prompt])
-        else:
-            raise ValueError("Unsupported file type.")
-
-    # Clean and parse the response
-    response_text = response.text.strip()
-    
-    # Handle cases where the response might include markdown code blocks
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0].strip()
-    elif "```" in response_text:
-        response_text = response_text.split("```")[1].strip()
+    response = _generate(model, llm_prompt, document=document, text=text)
 
-    try:
-        # Parse the JSON response
-        quiz_data = json.loads(response_text)
-        
-        # Ensure the response has the required structure
-        if not isinstance(quiz_data, dict):
-            raise ValueError("Response is not a valid JSON object")
-        
-        if "topic" not in quiz_data or "questions" not in quiz_data:
-            raise ValueError("Response missing required fields (topic or questions)")
-        
-        if not isinstance(quiz_data["questions"], list):
-            raise ValueError("Questions field is not a list")
-            
-        # Return the properly formatted JSON string
-        return json.dumps(quiz_data)
-        
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse LLM response as JSON: {str(e)}")
+    # Parse the JSON response
+    quiz_data = parse_json_response(response.text)
+
+    # Ensure the response has the required structure
+    if not isinstance(quiz_data, dict):
+        raise ValueError("Response is not a valid JSON object")
+
+    if "topic" not in quiz_data or "questions" not in quiz_data:
+        raise ValueError("Response missing required fields (topic or questions)")
+
+    if not isinstance(quiz_data["questions"], list):
+        raise ValueError("Questions field is not a list")
+
+    # Return the properly formatted JSON string
+    return json.dumps(quiz_data)
@@ -0,0 +1,199 @@
+"""
+Deterministic quiz scoring: accuracy by type, difficulty and topic, time
+percentiles and a proficiency estimate, computed locally in the request.
+The result has the same shape as the LLM assessment, so clients can show
+it immediately and fetch the narrative later if wanted.
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, List
+
+# Harder questions count more towards the proficiency estimate.
+DIFFICULTY_WEIGHTS = {"Easy": 1, "Medium": 2, "Hard": 3}
+# Weighted accuracy from which each proficiency level starts.
+PROFICIENCY_LEVELS = ((0.8, "Advanced"), (0.5, "Intermediate"), (0, "Beginner"))
+# Buckets at or above this accuracy are strengths, below WEAK_ACCURACY
+# weaknesses.
+STRONG_ACCURACY = 0.75
+WEAK_ACCURACY = 0.5
+TYPE_LABELS = {
+    "mcq": "Multiple-choice questions",
+    "true-false": "True/false questions",
+    "fill-in-the-blank": "Fill-in-the-blank questions",
+}
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Nearest-rank percentile.
+    """
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent * len(ordered) / 100))
+    return ordered[rank - 1]
+
+
+def proficiency_level(score: float) -> str:
+    for threshold, level in PROFICIENCY_LEVELS:
+        if score >= threshold:
+            return level
+    return PROFICIENCY_LEVELS[-1][1]
+
+
+def _accuracy(bucket: Dict[str, int]) -> float:
+    return round(bucket["correct"] / bucket["total"], 3) if bucket["total"] else 0
+
+
+def _breakdown(results, field: str) -> Dict[str, Dict[str, Any]]:
+    buckets = defaultdict(lambda: {"total": 0, "correct": 0})
+    for result in results:
+        bucket = buckets[result[field]]
+        bucket["total"] += 1
+        bucket["correct"] += result["is_correct"]
+    return {
+        name: {**bucket, "accuracy": _accuracy(bucket)}
+        for name, bucket in buckets.items()
+    }
+
+
+def score_quiz(
+    topic: str,
+    questions: List[Dict[str, Any]],
+    user_answers: List[Dict[str, Any]],
+    question_times: List[float],
+) -> Dict[str, Any]:
+    results = []
+    for index, (question, answer, seconds) in enumerate(
+        zip(questions, user_answers, question_times)
+    ):
+        selected = answer.get("selected_answer")
+        results.append(
+            {
+                "question_number": index + 1,
+                "question": question["question"],
+                "type": question.get("type", "mcq"),
+                "difficulty": question.get("difficulty", "Medium"),
+                "topic": question.get("topic") or topic,
+                "correct_answer": question["correctAnswer"],
+                "selected_answer": selected,
+                "answered": bool(answer.get("answered")) and selected is not None,
+                "is_correct": selected == question["correctAnswer"],
+                "time_taken": seconds,
+            }
+        )
+
+    total = len(results)
+    correct = sum(result["is_correct"] for result in results)
+    weights = [DIFFICULTY_WEIGHTS.get(r["difficulty"], 2) for r in results]
+    weighted = sum(w for w, r in zip(weights, results) if r["is_correct"])
+    proficiency_score = round(weighted / sum(weights), 3) if weights else 0
+
+    times = [float(result["time_taken"]) for result in results]
+    correct_times = [float(r["time_taken"]) for r in results if r["is_correct"]]
+    incorrect_times = [float(r["time_taken"]) for r in results if not r["is_correct"]]
+    timing = {
+        "total_seconds": round(sum(times), 1),
+        "mean_seconds": round(sum(times) / len(times), 1) if times else 0,
+        "p50_seconds": percentile(times, 50),
+        "p90_seconds": percentile(times, 90),
+        "max_seconds": max(times, default=0),
+        "mean_correct_seconds": (
+            round(sum(correct_times) / len(correct_times), 1) if correct_times else None
+        ),
+        "mean_incorrect_seconds": (
+            round(sum(incorrect_times) / len(incorrect_times), 1)
+            if incorrect_times
+            else None
+        ),
+    }
+
+    by_type = _breakdown(results, "type")
+    by_difficulty = _breakdown(results, "difficulty")
+    by_topic = _breakdown(results, "topic")
+
+    return {
+        "summary": {
+            "total_questions": total,
+            "answered": sum(result["answered"] for result in results),
+            "correct": correct,
+            "accuracy": _accuracy({"total": total, "correct": correct}),
+            "proficiency_score": proficiency_score,
+        },
+        "by_type": by_type,
+        "by_difficulty": by_difficulty,
+        "by_topic": by_topic,
+        "timing": timing,
+        "questions": results,
+        # Same shape as the LLM assessment.
+        "overall_performance": _overall_performance(
+            proficiency_score, by_type, by_difficulty
+        ),
+        "time_management": _time_management(timing),
+        "topic_wise_analysis": _topic_wise_analysis(by_topic, results),
+    }
+
+
+def _overall_performance(proficiency_score, by_type, by_difficulty):
+    buckets = [
+        (TYPE_LABELS.get(name, name), stats) for name, stats in by_type.items()
+    ] + [(f"{name} questions", stats) for name, stats in by_difficulty.items()]
+    return {
+        "proficiency_level": proficiency_level(proficiency_score),
+        "strengths": [
+            f"{label}: {stats['correct']}/{stats['total']} correct"
+            for label, stats in buckets
+            if stats["accuracy"] >= STRONG_ACCURACY
+        ],
+        "weaknesses": [
+            f"{label}: {stats['correct']}/{stats['total']} correct"
+            for label, stats in buckets
+            if stats["accuracy"] < WEAK_ACCURACY
+        ],
+    }
+
+
+def _time_management(timing):
+    recommendations = []
+    slower_when_wrong = (
+        timing["mean_incorrect_seconds"] is not None
+        and timing["mean_correct_seconds"] is not None
+        and timing["mean_incorrect_seconds"] > timing["mean_correct_seconds"] * 1.5
+    )
+    if slower_when_wrong:
+        recommendations.append(
+            "Questions you got wrong took much longer; review those concepts "
+            "before timing yourself again."
+        )
+    if timing["p90_seconds"] > 2 * max(timing["p50_seconds"], 1):
+        recommendations.append(
+            "A few questions took far longer than the rest; move on and come "
+            "back to them instead of getting stuck."
+        )
+    if not recommendations:
+        recommendations.append("Your pace was steady across the quiz.")
+    return {
+        "time_management_assessment": (
+            f"Median {timing['p50_seconds']:g}s per question, "
+            f"90th percentile {timing['p90_seconds']:g}s, "
+            f"{timing['total_seconds']:g}s in total."
+        ),
+        "recommendations": recommendations,
+    }
+
+
+def _topic_wise_analysis(by_topic, results):
+    return [
+        {
+            "topic": name,
+            "mastery_level": proficiency_level(stats["accuracy"]),
+            "revision_points": [
+                f"{result['question']} (answer: {result['correct_answer']})"
+                for result in results
+                if result["topic"] == name and not result["is_correct"]
+            ],
+            "recommended_resources": [],
+        }
+        for name, stats in by_topic.items()
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_key', models.CharField(max_length=80)),
+                ('topic', models.CharField(max_length=255)),
+                ('question', models.TextField()),
+                ('options', models.JSONField()),
+                ('correct_answer', models.TextField()),
+                ('explanation', models.TextField(blank=True)),
+                ('type', models.CharField(max_length=32)),
+                ('difficulty', models.CharField(max_length=16)),
+                ('question_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_key', 'type', 'difficulty'], name='quiz_bankqu_source__541017_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bankquestion',
+            constraint=models.UniqueConstraint(fields=('source_key', 'question_hash'), name='unique_bank_question_per_source'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_question_bank'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=255)),
+                ('token', models.CharField(db_index=True, max_length=64)),
+                ('total_questions', models.PositiveIntegerField()),
+                ('answered', models.PositiveIntegerField()),
+                ('correct', models.PositiveIntegerField()),
+                ('accuracy', models.FloatField()),
+                ('proficiency_score', models.FloatField()),
+                ('total_seconds', models.FloatField()),
+                ('narrative', models.JSONField(blank=True, null=True)),
+                ('rolled_up', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_number', models.PositiveSmallIntegerField()),
+                ('question', models.TextField()),
+                ('type', models.CharField(max_length=32)),
+                ('difficulty', models.CharField(max_length=16)),
+                ('topic', models.CharField(max_length=255)),
+                ('selected_answer', models.TextField(blank=True, null=True)),
+                ('correct_answer', models.TextField()),
+                ('answered', models.BooleanField()),
+                ('is_correct', models.BooleanField()),
+                ('time_taken', models.FloatField()),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='quiz.quizattempt')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', 'created_at'], name='quiz_quizat_user_id_457f2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['topic', 'created_at'], name='quiz_quizat_topic_f83765_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['created_at'], name='quiz_attempt_pending_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizanswer',
+            constraint=models.UniqueConstraint(fields=('attempt', 'question_number'), name='unique_answer_per_question'),
+        ),
+    ]
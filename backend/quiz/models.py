@@ -1,3 +1,114 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class BankQuestion(models.Model):
+    """
+    A generated quiz question kept for reuse. Questions are grouped by the
+    source they were generated from: a document's content hash or the
+    hash of the submitted topic text.
+    """
+
+    source_key = models.CharField(max_length=80)
+    topic = models.CharField(max_length=255)
+    question = models.TextField()
+    options = models.JSONField()
+    correct_answer = models.TextField()
+    explanation = models.TextField(blank=True)
+    type = models.CharField(max_length=32)
+    difficulty = models.CharField(max_length=16)
+    # Hash of the normalized question text, so a source never stores the
+    # same question twice.
+    question_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_key", "question_hash"],
+                name="unique_bank_question_per_source",
+            )
+        ]
+        indexes = [models.Index(fields=["source_key", "type", "difficulty"])]
+
+    def to_dict(self):
+        return {
+            "question": self.question,
+            "options": self.options,
+            "correctAnswer": self.correct_answer,
+            "explanation": self.explanation,
+            "type": self.type,
+            "difficulty": self.difficulty,
+        }
+
+
+class QuizAttempt(models.Model):
+    """
+    A scored quiz submission. Per-user and per-topic statistics are rolled
+    up from attempts periodically by the analytics app.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="quiz_attempts",
+    )
+    topic = models.CharField(max_length=255)
+    # Narrative token of the submission; a resubmission by the same
+    # signed-in user returns the existing attempt.
+    token = models.CharField(max_length=64, db_index=True)
+    total_questions = models.PositiveIntegerField()
+    answered = models.PositiveIntegerField()
+    correct = models.PositiveIntegerField()
+    accuracy = models.FloatField()
+    proficiency_score = models.FloatField()
+    total_seconds = models.FloatField()
+    # LLM feedback, kept once generated so it outlives the cache.
+    narrative = models.JSONField(null=True, blank=True)
+    # Set once the attempt is included in the analytics rollups.
+    rolled_up = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "token"],
+                condition=models.Q(user__isnull=False),
+                name="unique_attempt_per_user",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["topic", "created_at"]),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(rolled_up=False),
+                name="quiz_attempt_pending_rollup",
+            ),
+        ]
+
+
+class QuizAnswer(models.Model):
+    attempt = models.ForeignKey(
+        QuizAttempt, on_delete=models.CASCADE, related_name="answers"
+    )
+    question_number = models.PositiveSmallIntegerField()
+    question = models.TextField()
+    type = models.CharField(max_length=32)
+    difficulty = models.CharField(max_length=16)
+    topic = models.CharField(max_length=255)
+    selected_answer = models.TextField(null=True, blank=True)
+    correct_answer = models.TextField()
+    answered = models.BooleanField()
+    is_correct = models.BooleanField()
+    time_taken = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["attempt", "question_number"],
+                name="unique_answer_per_question",
+            )
+        ]
@@ -0,0 +1,70 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from readme.profiling import profiled
+from video_generator.models import SourceDocument
+
+from .functionalities.assessment import analyze_quiz_performance
+from .functionalities.narrative import get_submission, store_narrative
+from .functionalities.question_bank import (
+    add_to_bank,
+    bank_is_low,
+    banked_questions,
+)
+from .functionalities.quiz_generation import iter_quiz_events
+
+
+@shared_task
+@profiled("refill_question_bank")
+def refill_question_bank(key: str, document_id=None, text: str = None):
+    """
+    Generate quizzes for a source until its bank is stocked, asking the LLM
+    to avoid the questions already banked.
+    """
+    document = SourceDocument.objects.get(pk=document_id) if document_id else None
+    try:
+        for _ in range(settings.QUIZ_BANK_REFILL_ROUNDS):
+            if not bank_is_low(key):
+                break
+            topic, questions = None, []
+            for event in iter_quiz_events(
+                document=document, text=text, exclude=banked_questions(key)
+            ):
+                if event["event"] == "topic":
+                    topic = event["topic"]
+                elif event["event"] == "question":
+                    questions.append(event["question"])
+            add_to_bank(key, topic, questions)
+    except Exception as e:
+        logging.error("Error refilling question bank %s: %s", key, e)
+    finally:
+        cache.delete(f"quiz-bank-refill:{key}")
+
+
+@shared_task
+@profiled("generate_assessment_narrative")
+def generate_assessment_narrative(token: str):
+    submission = get_submission(token)
+    if submission is None:
+        return
+    try:
+        result = analyze_quiz_performance(submission["topic"], submission["scores"])
+    except Exception as e:
+        result = {
+            "status": "error",
+            "message": "Failed to generate assessment",
+            "error": str(e),
+        }
+    if result["status"] == "success":
+        store_narrative(token, {"status": "ready", "data": result["data"]})
+    else:
+        logging.error("Error generating quiz narrative: %s", result.get("error"))
+        # Kept briefly, so a later request tries again.
+        store_narrative(
+            token,
+            {"status": "failed", "message": result["message"]},
+            timeout=settings.QUIZ_NARRATIVE_RETRY_SECONDS,
+        )
@@ -1,3 +1,144 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
 
-# Create your tests here.
+from . import views
+from .functionalities.scoring import percentile, proficiency_level, score_quiz
+
+
+def make_question(number, question_type="mcq", difficulty="Medium", topic=None):
+    question = {
+        "question": f"Question {number}",
+        "options": ["a", "b", "c", "d"],
+        "correctAnswer": "a",
+        "type": question_type,
+        "difficulty": difficulty,
+    }
+    if topic:
+        question["topic"] = topic
+    return question
+
+
+def answer(selected):
+    return {"selected_answer": selected, "answered": selected is not None}
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 90), 5)
+        self.assertEqual(percentile(values, 10), 1)
+
+    def test_empty(self):
+        self.assertEqual(percentile([], 50), 0)
+
+
+class ScoreQuizTests(SimpleTestCase):
+    def test_proficiency_is_weighted_by_difficulty(self):
+        questions = [
+            make_question(1, difficulty="Easy"),
+            make_question(2, difficulty="Hard"),
+        ]
+        # Only the hard question is right: 3 of 4 weighted points.
+        scores = score_quiz("Cells", questions, [answer("b"), answer("a")], [10, 10])
+
+        self.assertEqual(scores["summary"]["accuracy"], 0.5)
+        self.assertEqual(scores["summary"]["proficiency_score"], 0.75)
+        self.assertEqual(
+            scores["overall_performance"]["proficiency_level"], "Intermediate"
+        )
+
+    def test_breakdowns_and_unanswered_questions(self):
+        questions = [
+            make_question(1, "mcq", "Easy", topic="Membranes"),
+            make_question(2, "mcq", "Hard"),
+            make_question(3, "true-false", "Medium"),
+        ]
+        scores = score_quiz(
+            "Cells", questions, [answer("a"), answer(None), answer("a")], [1, 2, 3]
+        )
+
+        self.assertEqual(scores["summary"]["answered"], 2)
+        self.assertEqual(scores["summary"]["correct"], 2)
+        self.assertEqual(
+            scores["by_type"]["mcq"], {"total": 2, "correct": 1, "accuracy": 0.5}
+        )
+        self.assertEqual(scores["by_difficulty"]["Hard"]["accuracy"], 0)
+        self.assertEqual(set(scores["by_topic"]), {"Membranes", "Cells"})
+
+    def test_strengths_and_weaknesses(self):
+        questions = [
+            make_question(1, "true-false"),
+            make_question(2, "true-false"),
+            make_question(3, "fill-in-the-blank"),
+            make_question(4, "fill-in-the-blank"),
+        ]
+        scores = score_quiz(
+            "Cells",
+            questions,
+            [answer("a"), answer("a"), answer("b"), answer("a")],
+            [5, 5, 5, 5],
+        )
+
+        overall = scores["overall_performance"]
+        self.assertIn("True/false questions: 2/2 correct", overall["strengths"])
+        self.assertNotIn(
+            "Fill-in-the-blank questions: 1/2 correct", overall["strengths"]
+        )
+        self.assertEqual(overall["weaknesses"], [])
+
+    def test_weaknesses_below_half(self):
+        questions = [make_question(1, difficulty="Hard"), make_question(2, "mcq", "Hard")]
+        scores = score_quiz("Cells", questions, [answer("b"), answer("c")], [5, 5])
+
+        weaknesses = scores["overall_performance"]["weaknesses"]
+        self.assertIn("Multiple-choice questions: 0/2 correct", weaknesses)
+        self.assertIn("Hard questions: 0/2 correct", weaknesses)
+        revision_points = scores["topic_wise_analysis"][0]["revision_points"]
+        self.assertEqual(len(revision_points), 2)
+
+    def test_timing(self):
+        questions = [make_question(number) for number in range(1, 5)]
+        answers = [answer("a"), answer("a"), answer("b"), answer("b")]
+        scores = score_quiz("Cells", questions, answers, [2, 4, 10, 30])
+
+        timing = scores["timing"]
+        self.assertEqual(timing["p50_seconds"], 4)
+        self.assertEqual(timing["p90_seconds"], 30)
+        self.assertEqual(timing["mean_correct_seconds"], 3)
+        self.assertEqual(timing["mean_incorrect_seconds"], 20)
+        self.assertEqual(len(scores["time_management"]["recommendations"]), 2)
+
+
+class ProficiencyLevelTests(SimpleTestCase):
+    def test_thresholds(self):
+        self.assertEqual(proficiency_level(0.8), "Advanced")
+        self.assertEqual(proficiency_level(0.5), "Intermediate")
+        self.assertEqual(proficiency_level(0.49), "Beginner")
+
+
+@override_settings(ROOT_URLCONF="quiz.urls")
+class AnalyzeQuizResultsTests(TestCase):
+    def post(self, question_times):
+        request = APIRequestFactory().post(
+            "/analyze-quiz/",
+            {
+                "topic": "Cells",
+                "questions": [make_question(1)],
+                "user_answers": [answer("a")],
+                "question_times": question_times,
+            },
+            format="json",
+        )
+        return views.analyze_quiz_results(request)
+
+    def test_invalid_times_are_rejected(self):
+        for question_times in ([None], ["soon"], [-1]):
+            with self.subTest(question_times=question_times):
+                self.assertEqual(self.post(question_times).status_code, 400)
+
+    def test_valid_times_are_scored(self):
+        response = self.post([12.5])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["timing"]["total_seconds"], 12.5)
@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path("generate-questions/", views.generate_quiz, name="generate_quiz"),
     path('analyze-quiz/', views.analyze_quiz_results, name='analyze-quiz'),
+    path('analyze-quiz/narrative/<str:token>/', views.get_quiz_narrative, name='quiz-narrative'),
 
 ]
@@ -1,21 +1,112 @@
-from django.http import HttpRequest
+from django.db import DatabaseError
+from django.http import HttpRequest, StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 import json
+import math
 import os
 import logging
-from .functionalities.quiz_generation import generate_quiz_questions
-from .functionalities.assessment import analyze_quiz_performance
+from readme.profiling import profiled
+from video_generator.functionalities.documents import store_document
+from .functionalities.question_bank import (
+    add_to_bank,
+    schedule_refill,
+    serve_quiz,
+    source_key,
+)
+from .functionalities.quiz_generation import generate_quiz_questions, iter_quiz_events
+from .functionalities.attempts import record_attempt
+from .functionalities.narrative import request_narrative, save_submission
+from .functionalities.scoring import score_quiz
 
 ACCEPTED_FORMATS = [".pdf", ".doc", ".docx", ".pptx", ".jpg", ".jpeg", ".png"]
 
+
+def _is_seconds(value) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+        and value >= 0
+    )
+
+
+def _wants_stream(request) -> bool:
+    return str(request.query_params.get("stream", "")).lower() == "true"
+
+
+def _stream_quiz(key, document=None, text=None):
+    """
+    Newline-delimited JSON events ({"event": "topic" | "question" | "done" |
+    "error", ...}), sent as each batch of questions is ready so the client
+    can show the first questions while the rest are generated. The
+    questions are added to the bank once the quiz is complete.
+    """
+
+    def events():
+        topic, questions = None, []
+        try:
+            for event in iter_quiz_events(document=document, text=text):
+                if event["event"] == "topic":
+                    topic = event["topic"]
+                elif event["event"] == "question":
+                    questions.append(event["question"])
+                yield json.dumps(event) + "\n"
+            add_to_bank(key, topic, questions)
+            schedule_refill(key, document=document, text=text)
+        except Exception as e:
+            logging.error(f"Error generating quiz: {str(e)}")
+            yield json.dumps({"event": "error", "message": str(e)}) + "\n"
+
+    return _ndjson_response(events())
+
+
+def _banked_events(quiz_data):
+    yield json.dumps({"event": "topic", "topic": quiz_data["topic"]}) + "\n"
+    for question in quiz_data["questions"]:
+        yield json.dumps({"event": "question", "question": question}) + "\n"
+    yield json.dumps(
+        {"event": "done", "total_questions": len(quiz_data["questions"])}
+    ) + "\n"
+
+
+def _ndjson_response(lines):
+    response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _quiz_response(quiz_data, message):
+    questions = quiz_data["questions"]
+    return Response({
+        "status": "success",
+        "message": message,
+        "data": {
+            "topic": quiz_data["topic"],
+            "questions": questions,
+            "total_questions": len(questions),
+            "types": {
+                "mcq": len([q for q in questions if q["type"] == "mcq"]),
+                "true_false": len([q for q in questions if q["type"] == "true-false"]),
+                "fill_in_blank": len([q for q in questions if q["type"] == "fill-in-the-blank"])
+            }
+        }
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(["POST"])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
+@profiled()
 def generate_quiz(request: HttpRequest):
     """
     Generate quiz questions from either uploaded files or direct text input.
+    Sources quizzed before are served from the question bank; otherwise the
+    questions are generated, streamed as NDJSON with ?stream=true.
     """
     try:
         # Get input parameters
@@ -33,6 +124,7 @@ def generate_quiz(request: HttpRequest):
             )
 
         # Handle file upload case
+        document = None
         if file:
             # Validate file format
             file_extension = os.path.splitext(file.name)[1].lower()
@@ -45,65 +137,37 @@ def generate_quiz(request: HttpRequest):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Save file temporarily
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-                for chunk in file.chunks():
-                    temp_file.write(chunk)
-                temp_file_path = temp_file.name
-
-            try:
-                # Generate questions from file
-                quiz_json = generate_quiz_questions(file_path=temp_file_path)
-                
-                # Clean up temp file
-                os.unlink(temp_file_path)
-                
-                # Parse the response
-                quiz_data = json.loads(quiz_json)
-                questions = quiz_data["questions"]
-                
-                return Response({
-                    "status": "success",
-                    "message": "Quiz generated successfully from file",
-                    "data": {
-                        "topic": quiz_data["topic"],
-                        "questions": questions,
-                        "total_questions": len(questions),
-                        "types": {
-                            "mcq": len([q for q in questions if q["type"] == "mcq"]),
-                            "true_false": len([q for q in questions if q["type"] == "true-false"]),
-                            "fill_in_blank": len([q for q in questions if q["type"] == "fill-in-the-blank"])
-                        }
-                    }
-                }, status=status.HTTP_200_OK)
-
-            except Exception as e:
-                # Clean up temp file in case of error
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                raise e
-
-        # Handle text input case
-        else:
-            quiz_json = generate_quiz_questions(text=text)
-            quiz_data = json.loads(quiz_json)
-            questions = quiz_data["questions"]
-            
-            return Response({
-                "status": "success",
-                "message": "Quiz generated successfully from text",
-                "data": {
-                    "topic": quiz_data["topic"],
-                    "questions": questions,
-                    "total_questions": len(questions),
-                    "types": {
-                        "mcq": len([q for q in questions if q["type"] == "mcq"]),
-                        "true_false": len([q for q in questions if q["type"] == "true-false"]),
-                        "fill_in_blank": len([q for q in questions if q["type"] == "fill-in-the-blank"])
-                    }
-                }
-            }, status=status.HTTP_200_OK)
+            # Identical uploads share one stored document, so its text and
+            # uploaded copy are reused.
+            document = store_document(file)
+            text = None
+
+        source = "file" if document else "text"
+        key = source_key(document=document, text=text)
+
+        # A source that has been quizzed before is answered from the bank.
+        quiz_data = serve_quiz(key)
+        if quiz_data:
+            schedule_refill(key, document=document, text=text)
+            if _wants_stream(request):
+                return _ndjson_response(_banked_events(quiz_data))
+            return _quiz_response(quiz_data, f"Quiz generated successfully from {source}")
+
+        if _wants_stream(request):
+            return _stream_quiz(key, document=document, text=text)
+
+        quiz_data = json.loads(generate_quiz_questions(document=document, text=text))
+        add_to_bank(key, quiz_data["topic"], quiz_data["questions"])
+        schedule_refill(key, document=document, text=text)
+        return _quiz_response(quiz_data, f"Quiz generated successfully from {source}")
+
+    except ParseError as e:
+        # Raised while reading the upload, e.g. too large or not the type
+        # its extension claims.
+        return Response({
+            "status": "error",
+            "message": str(e.detail)
+        }, status=status.HTTP_400_BAD_REQUEST)
 
     except Exception as e:
         logging.error(f"Error generating quiz: {str(e)}")
@@ -114,9 +178,11 @@ def generate_quiz(request: HttpRequest):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
 @api_view(["POST"])
+@profiled()
 def analyze_quiz_results(request: HttpRequest):
     """
-    Analyze quiz results and provide performance assessment.
+    Score quiz results, record the attempt and return the assessment
+    immediately.
     """
     try:
         # Validate required fields
@@ -141,15 +207,36 @@ def analyze_quiz_results(request: HttpRequest):
                 "message": "Mismatch in data lengths for questions, answers, and times"
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Generate assessment
-        assessment_result = analyze_quiz_performance(
+        # Times are scored as numbers of seconds
+        if not all(_is_seconds(seconds) for seconds in question_times):
+            return Response({
+                "status": "error",
+                "message": "question_times must be non-negative numbers of seconds"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Scored locally, so the results can be shown at once. The LLM
+        # narrative is generated only if requested with the token.
+        scores = score_quiz(
             topic=topic,
             questions=questions,
             user_answers=user_answers,
             question_times=question_times
         )
+        token = save_submission(topic, scores)
+        try:
+            # Kept for the user's history and the analytics rollups.
+            record_attempt(request.user, topic, scores, token)
+        except DatabaseError as e:
+            # The scores are still returned; only the history misses them.
+            logging.error(f"Error recording quiz attempt: {str(e)}")
 
-        return Response(assessment_result, status=status.HTTP_200_OK)
+        return Response({
+            "status": "success",
+            "message": "Assessment generated successfully",
+            "data": scores,
+            "narrative_token": token,
+            "narrative_url": reverse("quiz-narrative", args=[token]),
+        }, status=status.HTTP_200_OK)
 
     except Exception as e:
         logging.error(f"Error analyzing quiz results: {str(e)}")
@@ -157,4 +244,23 @@ def analyze_quiz_results(request: HttpRequest):
             "status": "error",
             "message": "An error occurred while analyzing quiz results",
             "error": str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+@profiled()
+def get_quiz_narrative(request: HttpRequest, token: str):
+    """
+    LLM feedback on a scored quiz. The first request queues it and returns
+    202; poll until the status is "ready".
+    """
+    narrative = request_narrative(token)
+    if narrative is None:
+        return Response({
+            "status": "error",
+            "message": "Unknown or expired assessment. Submit the quiz results again."
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if narrative["status"] == "pending":
+        return Response(narrative, status=status.HTTP_202_ACCEPTED)
+    return Response(narrative, status=status.HTTP_200_OK)
@@ -2,6 +2,8 @@
 ASGI config for readme project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project through it (e.g. ``uvicorn readme.asgi:application``) so
+streaming responses such as the video progress events are not buffered.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
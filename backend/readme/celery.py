@@ -1,7 +1,10 @@
 from __future__ import absolute_import, unicode_literals
 import logging
 import os
+import time
 from logging.config import dictConfig
+
+import redis
 from celery.signals import setup_logging
 from celery import Celery
 from celery import signals
@@ -31,6 +34,69 @@ def debug_task(self):
     print(f"Request: {self.request!r}")
 
 
+# The Redis transport keeps each queue in a list named after it, plus one list
+# per non-zero priority step.
+_PRIORITY_SEPARATOR = "\x06\x16"
+_PRIORITY_STEPS = (0, 3, 6, 9)
+_broker_client = None
+
+
+def queue_depths(queue_names=None) -> dict:
+    """
+    Number of messages waiting in each queue (all configured queues by
+    default), read straight from the broker.
+    """
+    global _broker_client
+    if _broker_client is None:
+        _broker_client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+
+    if queue_names is None:
+        queue_names = [queue.name for queue in settings.CELERY_TASK_QUEUES]
+    pipeline = _broker_client.pipeline(transaction=False)
+    for name in queue_names:
+        for step in _PRIORITY_STEPS:
+            pipeline.llen(f"{name}{_PRIORITY_SEPARATOR}{step}" if step else name)
+    lengths = pipeline.execute()
+
+    steps = len(_PRIORITY_STEPS)
+    return {
+        name: sum(lengths[index * steps : (index + 1) * steps])
+        for index, name in enumerate(queue_names)
+    }
+
+
+@signals.before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    # Read back as task.request.published_at to measure queue wait
+    if headers is not None:
+        headers["published_at"] = time.time()
+
+
+@signals.task_prerun.connect
+def record_task_start(task=None, **kwargs):
+    from readme.metrics import CELERY_QUEUE_WAIT_SECONDS
+
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        CELERY_QUEUE_WAIT_SECONDS.observe(time.time() - published_at, task=task.name)
+    task.request.started_at = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def record_task_duration(task=None, state=None, **kwargs):
+    from readme.metrics import CELERY_TASK_SECONDS, REGISTRY
+
+    started_at = getattr(task.request, "started_at", None)
+    if started_at:
+        CELERY_TASK_SECONDS.observe(
+            time.perf_counter() - started_at,
+            task=task.name,
+            outcome=(state or "unknown").lower(),
+        )
+    # Tasks are long and infrequent, so publish their samples right away.
+    REGISTRY.flush()
+
+
 @signals.worker_shutdown.connect
 def handle_worker_shutdown(*args, **kwargs):
     for handler in logging.getLogger().handlers:
@@ -0,0 +1,182 @@
+"""
+Media serving with HTTP Range support, conditional requests and optional
+web server offload (X-Sendfile / X-Accel-Redirect).
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Streaming and preview formats produced by the video pipeline.
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+mimetypes.add_type("video/iso.segment", ".m4s")
+mimetypes.add_type("text/vtt", ".vtt")
+
+
+class RangeFileWrapper:
+    """
+    File-like object exposing only a byte range of a file. It keeps the real
+    file descriptor so WSGI servers can still use sendfile() for the range.
+    """
+
+    def __init__(self, filelike, offset: int, length: int):
+        self.filelike = filelike
+        self.remaining = length
+        self.filelike.seek(offset)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.filelike.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.filelike.fileno()
+
+    def close(self):
+        self.filelike.close()
+
+
+def parse_range_header(header: str, size: int):
+    """
+    Parse a single "bytes=start-end" range. Returns (start, end) inclusive,
+    None when the header should be ignored, or False when unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: serve the full file.
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix range: the last N bytes.
+        length = int(end)
+        if length == 0 or size == 0:
+            # No bytes to return, including from an empty file.
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _file_etag(stat_result) -> str:
+    return quote_etag(f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}")
+
+
+def _offload_response(full_path: str, path: str, content_type: str):
+    """
+    Let the front web server send the file. It handles Range on its own.
+    """
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE_BACKEND == "x-accel-redirect":
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(path)
+        )
+    else:
+        response["X-Sendfile"] = full_path
+    return response
+
+
+@require_safe
+def serve_media(request, path: str):
+    """
+    Serve a file from MEDIA_ROOT, honouring If-None-Match, If-Modified-Since,
+    Range and If-Range.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation as e:
+        raise Http404("Media file not found.") from e
+
+    try:
+        stat_result = os.stat(full_path)
+    except OSError as e:
+        raise Http404("Media file not found.") from e
+    if not os.path.isfile(full_path):
+        raise Http404("Media file not found.")
+
+    etag = _file_etag(stat_result)
+    last_modified = int(stat_result.st_mtime)
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_SENDFILE_BACKEND:
+        response = _offload_response(full_path, path, content_type)
+    else:
+        size = stat_result.st_size
+        byte_range = None
+        range_header = request.headers.get("Range")
+        if range_header and _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range_header(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        filelike = open(full_path, "rb")
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(
+                RangeFileWrapper(filelike, start, length),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = str(length)
+        else:
+            # FileResponse hands the open file to wsgi.file_wrapper, which
+            # uses os.sendfile() where the server supports it.
+            response = FileResponse(filelike, content_type=content_type)
+            response["Content-Length"] = str(size)
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+    return response
+
+
+def _if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """
+    A Range request with If-Range is only honoured if the validator still
+    matches the file; otherwise the full file is sent.
+    """
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
@@ -0,0 +1,377 @@
+"""
+Prometheus-style metrics shared by the web and Celery processes.
+
+Every process aggregates counters and histogram buckets in memory and
+periodically adds them to Redis hashes (one per metric), so the /metrics
+endpoint reports the totals across all gunicorn and Celery workers.
+"""
+
+import atexit
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+from readme.celery import queue_depths
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+)
+
+
+def _format_labels(labels: dict) -> str:
+    return ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in sorted(labels.items())
+    )
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._client = None
+        self._flusher_pid = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Short timeouts, so an unreachable Redis only delays the flusher
+            # and /metrics, never for the OS TCP timeout.
+            self._client = redis.Redis.from_url(
+                settings.METRICS_REDIS_URL,
+                socket_connect_timeout=settings.METRICS_REDIS_TIMEOUT,
+                socket_timeout=settings.METRICS_REDIS_TIMEOUT,
+            )
+        return self._client
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def register_collector(self, collector):
+        """
+        Add a callable returning (name, type, help, [(labels, value), ...])
+        tuples computed when /metrics is scraped, e.g. queue depths.
+        """
+        self.collectors.append(collector)
+        return collector
+
+    def add(self, name: str, field: str, amount: float):
+        with self._lock:
+            # Started per process: threads do not survive the fork of
+            # gunicorn and Celery prefork workers, and samples inherited
+            # from the parent are the parent's to flush.
+            start_flusher = self._flusher_pid != os.getpid()
+            if start_flusher:
+                self._flusher_pid = os.getpid()
+                self._pending = defaultdict(float)
+            self._pending[(name, field)] += amount
+        if start_flusher:
+            threading.Thread(
+                target=self._flush_periodically, name="metrics-flusher", daemon=True
+            ).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for (name, field), amount in pending.items():
+                pipeline.hincrbyfloat(f"metrics:{name}", field, amount)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not flush %d metric samples: %s", len(pending), e)
+            # Kept for the next flush, so counts are late rather than lost.
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+
+    def render(self) -> str:
+        self.flush()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            samples = self.client.hgetall(f"metrics:{metric.name}")
+            for field, value in sorted(samples.items()):
+                suffix, _, labels = field.decode().partition("|")
+                lines.append(f"{metric.name}{suffix}{{{labels}}} {float(value):g}")
+
+        for collector in self.collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{{{_format_labels(labels)}}} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+atexit.register(REGISTRY.flush)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def inc(self, amount: float = 1, **labels):
+        REGISTRY.add(self.name, f"_total|{_format_labels(labels)}", amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        REGISTRY.register(self)
+
+    def observe(self, value: float, **labels):
+        label_string = _format_labels(labels)
+        for bound in self.buckets:
+            if value <= bound:
+                bucket_labels = _format_labels({**labels, "le": f"{bound:g}"})
+                REGISTRY.add(self.name, f"_bucket|{bucket_labels}", 1)
+        REGISTRY.add(
+            self.name, f"_bucket|{_format_labels({**labels, 'le': '+Inf'})}", 1
+        )
+        REGISTRY.add(self.name, f"_sum|{label_string}", value)
+        REGISTRY.add(self.name, f"_count|{label_string}", 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the block, labelled with its outcome.
+        """
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            yield
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.observe(time.perf_counter() - started, outcome=outcome, **labels)
+
+
+def timed(histogram: Histogram, **labels):
+    """
+    Decorator observing a function's duration. The outcome label is "error"
+    if it raises, "empty" if it returns None and "success" otherwise.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await func(*args, **kwargs)
+                    outcome = "empty" if result is None else "success"
+                    return result
+                finally:
+                    histogram.observe(
+                        time.perf_counter() - started, outcome=outcome, **labels
+                    )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "empty" if result is None else "success"
+                return result
+            finally:
+                histogram.observe(
+                    time.perf_counter() - started, outcome=outcome, **labels
+                )
+
+        return wrapper
+
+    return decorator
+
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of LLM calls.",
+    ("provider", "stage", "outcome"),
+)
+TTS_REQUEST_SECONDS = Histogram(
+    "tts_request_duration_seconds",
+    "Latency of text-to-speech synthesis.",
+    ("provider", "outcome"),
+)
+IMAGE_FETCH_SECONDS = Histogram(
+    "image_fetch_duration_seconds",
+    "Latency of image searches and downloads.",
+    ("provider", "outcome"),
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "video_pipeline_stage_duration_seconds",
+    "Duration of each video job stage.",
+    ("stage", "outcome"),
+)
+VIDEO_ENCODE_SECONDS = Histogram(
+    "video_encode_duration_seconds",
+    "Wall time of video encodes by preset.",
+    ("preset", "outcome"),
+)
+CELERY_TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Run time of Celery tasks.",
+    ("task", "outcome"),
+)
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time Celery tasks spent queued before a worker started them.",
+    ("task",),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route.",
+    ("route", "method", "status"),
+)
+HTTP_REQUESTS = Counter(
+    "http_requests", "HTTP requests by route.", ("route", "method", "status")
+)
+
+
+class MetricsMiddleware:
+    """
+    Time each request by route. Works in both the WSGI and ASGI handlers
+    without a thread hop, and streamed responses (e.g. the progress events)
+    are timed until their last chunk is sent.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        return self._observe(request, self.get_response(request), started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        return self._observe(request, await self.get_response(request), started)
+
+    def _observe(self, request, response, started):
+        match = getattr(request, "resolver_match", None)
+        labels = {
+            "route": match.route if match else "unmatched",
+            "method": request.method,
+            "status": f"{response.status_code // 100}xx",
+        }
+
+        def record():
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, **labels)
+            HTTP_REQUESTS.inc(**labels)
+
+        if not response.streaming:
+            record()
+        elif response.is_async:
+            response.streaming_content = _after_async_stream(
+                response.streaming_content, record
+            )
+        else:
+            response.streaming_content = _after_stream(
+                response.streaming_content, record
+            )
+        return response
+
+
+def _after_stream(chunks, callback):
+    try:
+        yield from chunks
+    finally:
+        callback()
+
+
+async def _after_async_stream(chunks, callback):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        callback()
+
+
+def metrics_view(request):
+    try:
+        body = REGISTRY.render()
+    except redis.RedisError as e:
+        logger.warning("Could not read metrics from Redis: %s", e)
+        return HttpResponse(
+            "Metrics are unavailable.\n",
+            status=503,
+            content_type="text/plain; charset=utf-8",
+        )
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+
+@REGISTRY.register_collector
+def celery_queue_depths():
+    samples = [({"queue": name}, depth) for name, depth in queue_depths().items()]
+    return [
+        (
+            "celery_queue_depth",
+            "gauge",
+            "Messages waiting in each Celery queue.",
+            samples,
+        )
+    ]
@@ -0,0 +1,131 @@
+"""
+Opt-in sampled profiling for Celery tasks and views.
+
+A configurable fraction of executions (PROFILING_SAMPLE_RATE) is profiled.
+Each profiled run writes collapsed stacks (``.folded``, one "frame;frame;frame
+count" line per stack, ready for flamegraph tools) and cProfile statistics
+(``.prof``) to PROFILING_DIR. ``manage.py aggregate_profiles`` merges them.
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the call stack of one thread at a fixed interval and counts
+    identical stacks.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def should_profile() -> bool:
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+# Only one cProfile profiler can be active per process (Python 3.12+ raises
+# otherwise), so concurrent or nested sampled executions run unprofiled.
+_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def profile(name: str):
+    """
+    Profile the enclosed block if this execution is sampled and no other
+    profile is running in the process.
+    """
+    if not should_profile() or not _profiler_lock.acquire(blocking=False):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool (e.g. a debugger or coverage) is active.
+        _profiler_lock.release()
+        yield
+        return
+
+    sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _profiler_lock.release()
+        elapsed = time.perf_counter() - started
+        try:
+            _write_profile(name, profiler, sampler.stacks)
+            logger.info("Profiled %s in %.2fs", name, elapsed)
+        except OSError as e:
+            logger.warning("Could not write profile for %s: %s", name, e)
+
+
+def _write_profile(name: str, profiler: cProfile.Profile, stacks: Counter):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    base_name = os.path.join(
+        settings.PROFILING_DIR,
+        f"{name}.{time.strftime('%Y%m%d%H%M%S')}.{os.getpid()}.{uuid.uuid4().hex[:8]}",
+    )
+    profiler.dump_stats(f"{base_name}.prof")
+    with open(f"{base_name}.folded", "w", encoding="utf8") as folded:
+        for stack, count in stacks.items():
+            folded.write(f"{stack} {count}\n")
+
+
+def profiled(name: str = None):
+    """
+    Decorator form of `profile`. Use it below @shared_task or @api_view.
+    """
+
+    def decorator(func):
+        profile_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile(profile_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,121 @@
+"""
+Upload handling that hashes and checks files while they stream in.
+
+Small requests are kept in memory and large ones written to a temporary
+file, as with Django's default handlers. Each chunk is also fed to a
+SHA-256 digest, and the first bytes are checked against the signature of
+the file's extension. Oversized or mislabelled files are rejected before
+the rest of the body is stored.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+# Leading bytes of each accepted document type.
+SIGNATURES = {
+    ".pdf": (b"%PDF-",),
+    # DOCX and PPTX are ZIP archives.
+    ".docx": (b"PK\x03\x04",),
+    ".pptx": (b"PK\x03\x04",),
+    # Legacy Office files are OLE compound documents.
+    ".doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+}
+SIGNATURE_LENGTH = max(len(s) for values in SIGNATURES.values() for s in values)
+# Allowance for multipart headers and form fields sent with the file.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadRejected(MultiPartParserError):
+    pass
+
+
+class HashingUploadHandler(FileUploadHandler):
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # The whole body is over the limit: refuse before reading any of it.
+        if content_length > settings.UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES:
+            raise UploadRejected(
+                f"Upload is larger than {settings.UPLOAD_MAX_BYTES} bytes."
+            )
+        self.in_memory = content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.extension = os.path.splitext(self.file_name or "")[-1].lower()
+        self.digest = hashlib.sha256()
+        self.head = b""
+        self.size = 0
+        if self.in_memory:
+            self.file = BytesIO()
+        else:
+            self.file = TemporaryUploadedFile(
+                self.file_name,
+                self.content_type,
+                0,
+                self.charset,
+                self.content_type_extra,
+            )
+
+    def _reject(self, message: str):
+        # Closing a temporary upload deletes it.
+        self.file.close()
+        raise UploadRejected(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.UPLOAD_MAX_BYTES:
+            self._reject(f"Upload is larger than {settings.UPLOAD_MAX_BYTES} bytes.")
+
+        if len(self.head) < SIGNATURE_LENGTH:
+            self.head += raw_data[: SIGNATURE_LENGTH - len(self.head)]
+            signatures = SIGNATURES.get(self.extension)
+            if (
+                signatures
+                and len(self.head) >= SIGNATURE_LENGTH
+                and not self.head.startswith(signatures)
+            ):
+                self._reject(f"{self.file_name} is not a valid {self.extension} file.")
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        signatures = SIGNATURES.get(self.extension)
+        if signatures and not self.head.startswith(signatures):
+            # Shorter than the signature check above needed.
+            self._reject(f"{self.file_name} is not a valid {self.extension} file.")
+
+        self.file.seek(0)
+        if self.in_memory:
+            upload = InMemoryUploadedFile(
+                file=self.file,
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=file_size,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        else:
+            upload = self.file
+            upload.size = file_size
+        # Read by the document store instead of hashing the file again.
+        upload.content_hash = self.digest.hexdigest()
+        return upload
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
@@ -16,18 +16,22 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .media import serve_media
+from .metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view),
     path("", include("video_generator.urls")),
     path("", include("quiz.urls")),
+    path("", include("analytics.urls")),
     path("", include("users.urls")),
     path("",include("pomodoro.urls")),
     path("",include("yt_summarizer.urls")),
     path("",include("sticky_notes.urls")),
-    path("",include("task_automation.urls"))
-
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("",include("task_automation.urls")),
+    re_path(rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.+)$", serve_media),
+]
@@ -1,5 +1,61 @@
 from django.contrib import admin
-from .models import VideoProcessingJob, Video
+from .functionalities.progress import VIDEO_JOB_STAGES
+from .models import SourceDocument, VideoProcessingJob, Video, VideoJobStage
+
+# Number of most recent runs of each stage used for the percentiles.
+STAGE_PERCENTILE_SAMPLE = 500
+
+
+def percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def stage_duration_percentiles():
+    stats = []
+    for name in VIDEO_JOB_STAGES:
+        rows = (
+            VideoJobStage.objects.filter(
+                name=name, succeeded=True, ended_at__isnull=False
+            )
+            .order_by("-ended_at")
+            .values_list("started_at", "ended_at")[:STAGE_PERCENTILE_SAMPLE]
+        )
+        durations = sorted(
+            (ended_at - started_at).total_seconds() for started_at, ended_at in rows
+        )
+        if durations:
+            stats.append(
+                {
+                    "name": name,
+                    "samples": len(durations),
+                    "p50": round(percentile(durations, 50), 2),
+                    "p95": round(percentile(durations, 95), 2),
+                }
+            )
+    return stats
+
+
+class VideoJobStageInline(admin.TabularInline):
+    model = VideoJobStage
+    extra = 0
+    can_delete = False
+    fields = (
+        "name",
+        "started_at",
+        "ended_at",
+        "duration",
+        "succeeded",
+        "bytes",
+        "count",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(VideoProcessingJob)
@@ -8,6 +64,7 @@ class VideoProcessingJobAdmin(admin.ModelAdmin):
     list_filter = ("status",)
     search_fields = ("job_id", "status")
     readonly_fields = ("job_id", "created_at")
+    inlines = (VideoJobStageInline,)
     fieldsets = (
         (
             None,
@@ -21,6 +78,28 @@ class VideoProcessingJobAdmin(admin.ModelAdmin):
         ),
     )
 
+    def changelist_view(self, request, extra_context=None):
+        # p50/p95 stage durations shown above the job list
+        extra_context = extra_context or {}
+        extra_context["stage_percentiles"] = stage_duration_percentiles()
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(VideoJobStage)
+class VideoJobStageAdmin(admin.ModelAdmin):
+    list_display = (
+        "job",
+        "name",
+        "started_at",
+        "duration",
+        "succeeded",
+        "bytes",
+        "count",
+    )
+    list_filter = ("name", "succeeded")
+    search_fields = ("job__job_id",)
+    list_select_related = ("job",)
+
 
 class VideoAdmin(admin.ModelAdmin):
     list_display = (
@@ -36,3 +115,18 @@ class VideoAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Video, VideoAdmin)
+
+
+@admin.register(SourceDocument)
+class SourceDocumentAdmin(admin.ModelAdmin):
+    list_display = ("original_name", "content_hash", "size", "page_count", "created_at")
+    search_fields = ("original_name", "content_hash")
+    readonly_fields = (
+        "content_hash",
+        "extracted_at",
+        "remote_name",
+        "remote_uri",
+        "remote_mime_type",
+        "remote_expires_at",
+    )
+    exclude = ("text", "page_offsets")
@@ -2,6 +2,20 @@ import os
 from django.apps import AppConfig
 
 from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    WAL lets readers proceed while a Celery worker writes, and NORMAL
+    synchronous mode is durable across application crashes in WAL mode.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
 
 
 class VideoGeneratorConfig(AppConfig):
@@ -9,6 +23,16 @@ class VideoGeneratorConfig(AppConfig):
     name = "video_generator"
 
     def ready(self):
+        connection_created.connect(configure_sqlite)
+
+        from .functionalities.feed import invalidate_feed_on_change
+        from .functionalities.video_cache import invalidate_video
+
+        post_save.connect(invalidate_video, sender="video_generator.Video")
+        post_delete.connect(invalidate_video, sender="video_generator.Video")
+        post_save.connect(invalidate_feed_on_change, sender="video_generator.Video")
+        post_delete.connect(invalidate_feed_on_change, sender="video_generator.Video")
+
         if not os.path.exists(settings.UPLOADED_DOCUMENTS_FOLDER):
             os.makedirs(settings.UPLOADED_DOCUMENTS_FOLDER)
 
@@ -0,0 +1,97 @@
+import math
+from datetime import timedelta
+from statistics import median
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from readme.celery import queue_depths
+from ..models import VideoProcessingJob
+
+ACTIVE_STATUSES = ("queued", "processing")
+
+
+def typical_job_seconds() -> float:
+    """
+    Median processing time of recent completed jobs, from their first stage
+    start to their last stage end. Cached briefly, as every submission and
+    status poll needs it.
+    """
+
+    def compute():
+        spans = (
+            VideoProcessingJob.objects.filter(status="completed")
+            .annotate(
+                started_at=Min("stages__started_at"),
+                finished_at=Max("stages__ended_at"),
+            )
+            .exclude(finished_at=None)
+            .order_by("-created_at")
+            .values_list("started_at", "finished_at")[:20]
+        )
+        durations = [(finished - started).total_seconds() for started, finished in spans]
+        return median(durations) if durations else settings.VIDEO_JOB_DEFAULT_SECONDS
+
+    return cache.get_or_set("video-job-typical-seconds", compute, 60)
+
+
+def active_jobs():
+    # Jobs older than the lock timeout are dead and no longer hold a worker.
+    since = timezone.now() - timedelta(seconds=settings.VIDEO_JOB_LOCK_TIMEOUT)
+    return VideoProcessingJob.objects.filter(
+        status__in=ACTIVE_STATUSES, created_at__gte=since
+    )
+
+
+def estimated_start_seconds(position: int) -> int:
+    """
+    Seconds until the job at `position` in the backlog (1 = next) starts,
+    assuming every render slot frees up after a typical job.
+    """
+    if position <= 0:
+        return 0
+    rounds = math.ceil(position / settings.VIDEO_RENDER_CAPACITY)
+    return round(rounds * typical_job_seconds())
+
+
+def queue_position(job: VideoProcessingJob) -> int:
+    """
+    Number of jobs that have to start before this one, itself included, or 0
+    if it can already run. Only counts rows, so it is cheap enough for polls.
+    """
+    ahead = active_jobs().filter(created_at__lt=job.created_at).count()
+    return max(0, ahead + 1 - settings.VIDEO_RENDER_CAPACITY)
+
+
+def check_admission(user=None):
+    """
+    Decide whether a new job may be queued. Returns None to admit it, or a
+    dict with a message and the seconds to wait before retrying.
+    """
+    if user is not None:
+        user_jobs = active_jobs().filter(user=user).count()
+        if user_jobs >= settings.VIDEO_MAX_ACTIVE_JOBS_PER_USER:
+            return {
+                "message": f"You already have {user_jobs} videos in progress. "
+                "Please wait for one to finish.",
+                "retry_after": round(typical_job_seconds()),
+            }
+
+    backlog = max(0, active_jobs().count() - settings.VIDEO_RENDER_CAPACITY)
+    try:
+        # Messages can also be waiting for a render worker without a job row
+        # in the active window, e.g. retries.
+        backlog = max(backlog, queue_depths(["render"])["render"])
+    except redis.RedisError:
+        pass
+
+    limit = settings.VIDEO_RENDER_CAPACITY * settings.VIDEO_MAX_BACKLOG_PER_SLOT
+    if backlog >= limit:
+        return {
+            "message": "The video generator is at capacity. Please try again later.",
+            "retry_after": estimated_start_seconds(backlog - limit + 1),
+        }
+    return None
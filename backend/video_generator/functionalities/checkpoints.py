@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+import redis
+from django.conf import settings
+
+from .progress import get_redis
+
+
+def job_work_dir(job_id) -> str:
+    """
+    Directory holding a job's intermediate files (cached images, encoded
+    segments). It survives worker crashes so a retried job can reuse them.
+    """
+    return os.path.join(settings.MEDIA_ROOT, "temp_asset", str(job_id))
+
+
+def _renew_lock(lock, stop: threading.Event):
+    # Extend the lock every third of its TTL while the job runs. If the
+    # worker dies, renewals stop and the lock expires within one TTL.
+    ttl = settings.VIDEO_JOB_LOCK_TTL
+    while not stop.wait(ttl / 3):
+        try:
+            lock.extend(ttl, replace_ttl=True)
+        except redis.exceptions.RedisError as e:
+            logging.warning("Could not renew %s: %s", lock.name, e)
+
+
+@contextmanager
+def job_lock(job_id):
+    """
+    Hold a Redis lock for the job while it runs. Yields False without waiting
+    if another worker holds it, e.g. when a message is redelivered while the
+    first delivery is still processing.
+    """
+    lock = get_redis().lock(
+        f"video-job-lock:{job_id}",
+        timeout=settings.VIDEO_JOB_LOCK_TTL,
+        # Renewed from the heartbeat thread, so the token must not be
+        # thread-local.
+        thread_local=False,
+    )
+    acquired = lock.acquire(blocking=False)
+    stop = threading.Event()
+    if acquired:
+        threading.Thread(target=_renew_lock, args=(lock, stop), daemon=True).start()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            stop.set()
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                # Expired while the job ran; nothing left to release.
+                pass
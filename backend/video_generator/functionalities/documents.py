@@ -0,0 +1,208 @@
+"""
+Content-addressed store for uploaded documents.
+
+Uploads are hashed once and saved as a SourceDocument. Extracted text and
+the provider-side copy of the file are kept on that row, so processing the
+same handout again (for another video, a quiz, a retry) is a lookup.
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from ..models import SourceDocument
+from .extraction import count_pdf_pages, iter_document_chunks
+from .progress import get_redis
+from .remote_files import RemoteFile, get_backend
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def hash_file(file) -> str:
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def upload_content_hash(file) -> str:
+    """
+    SHA-256 of an uploaded file, taken from HashingUploadHandler when it
+    hashed the upload as it streamed in.
+    """
+    return getattr(file, "content_hash", None) or hash_file(file)
+
+
+def store_document(file, content_hash: str = None) -> SourceDocument:
+    """
+    Return the SourceDocument for an uploaded (or any Django) file, saving
+    the file only the first time its content is seen. Uploads hashed by
+    readme.uploads.HashingUploadHandler are not read again, and temporary
+    uploads are moved into storage rather than copied.
+    """
+    content_hash = content_hash or upload_content_hash(file)
+    document = SourceDocument.objects.filter(content_hash=content_hash).first()
+    if document:
+        return document
+
+    name = os.path.basename(file.name)
+    document = SourceDocument(
+        content_hash=content_hash,
+        original_name=name[:255],
+        extension=os.path.splitext(name)[-1].lower(),
+        size=file.size,
+    )
+    document.file.save(name, file, save=False)
+    try:
+        document.save()
+    except IntegrityError:
+        # A concurrent upload of the same content won the race.
+        document.file.delete(save=False)
+        document = SourceDocument.objects.get(content_hash=content_hash)
+    return document
+
+
+def iter_document_pages(document: SourceDocument):
+    """
+    Yield the text of each page (slide, section) of the document. The first
+    call streams them from the extractor and stores them on the way; later
+    calls read the stored text.
+    """
+    if document.text is not None:
+        yield from document.pages
+        return
+
+    pages = []
+    for page in iter_document_chunks(document.file.path):
+        pages.append(page)
+        yield page
+
+    offsets, position = [], 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + len(SourceDocument.PAGE_SEPARATOR)
+    document.text = SourceDocument.PAGE_SEPARATOR.join(pages)
+    document.page_offsets = offsets
+    document.page_count = document.page_count or len(pages)
+    document.extracted_at = timezone.now()
+    document.save(
+        update_fields=["text", "page_offsets", "page_count", "extracted_at"]
+    )
+
+
+def document_text(document: SourceDocument) -> str:
+    if document.text is None:
+        # Consume the generator to extract and store the pages.
+        for _ in iter_document_pages(document):
+            pass
+    return document.text
+
+
+def document_page_count(document: SourceDocument) -> int:
+    """
+    Number of pages, counted without extracting text for PDFs.
+    """
+    if document.page_count is None:
+        if document.extension == ".pdf":
+            document.page_count = count_pdf_pages(document.file.path)
+            document.save(update_fields=["page_count"])
+        else:
+            document_text(document)
+    return document.page_count
+
+
+def _cached_remote(document: SourceDocument):
+    margin = timedelta(seconds=settings.DOCUMENT_REMOTE_EXPIRY_MARGIN)
+    if document.remote_uri and document.remote_expires_at > timezone.now() + margin:
+        return RemoteFile(
+            name=document.remote_name,
+            uri=document.remote_uri,
+            mime_type=document.remote_mime_type,
+            expires_at=document.remote_expires_at,
+        )
+    return None
+
+
+def remote_document(document: SourceDocument) -> RemoteFile:
+    """
+    Return the handle of the document's copy on the LLM provider. The stored
+    handle is trusted until it is about to expire; otherwise the file is
+    uploaded once, with concurrent callers for the same document waiting
+    for that upload instead of starting their own.
+    """
+    remote = _cached_remote(document)
+    if remote:
+        return remote
+
+    lock = get_redis().lock(
+        f"document-upload-lock:{document.content_hash}",
+        timeout=settings.DOCUMENT_UPLOAD_LOCK_TIMEOUT,
+        blocking_timeout=settings.DOCUMENT_UPLOAD_LOCK_TIMEOUT,
+    )
+    acquired = lock.acquire()
+    try:
+        document.refresh_from_db(
+            fields=["remote_name", "remote_uri", "remote_mime_type", "remote_expires_at"]
+        )
+        remote = _cached_remote(document)
+        if remote:
+            # Uploaded by whoever held the lock before us.
+            return remote
+
+        remote = get_backend().upload(
+            document.file.path, display_name=document.original_name
+        )
+        document.remote_name = remote.name
+        document.remote_uri = remote.uri
+        document.remote_mime_type = remote.mime_type
+        document.remote_expires_at = remote.expires_at
+        document.save(
+            update_fields=[
+                "remote_name",
+                "remote_uri",
+                "remote_mime_type",
+                "remote_expires_at",
+            ]
+        )
+        return remote
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                # Expired during a slow upload; nothing left to release.
+                pass
+
+
+def forget_remote(document: SourceDocument):
+    document.remote_name = document.remote_uri = document.remote_mime_type = None
+    document.remote_expires_at = None
+    document.save(
+        update_fields=["remote_name", "remote_uri", "remote_mime_type", "remote_expires_at"]
+    )
+
+
+def generate_with_document(model, prompt: str, document: SourceDocument, **kwargs):
+    """
+    Send the prompt with the document attached by reference. If the provider
+    has dropped its copy before the recorded expiry, upload it again once.
+    Keyword arguments go to generate_content.
+    """
+    backend = get_backend()
+    try:
+        return model.generate_content(
+            [prompt, backend.reference(remote_document(document))], **kwargs
+        )
+    except Exception as e:
+        if not backend.is_missing(e):
+            raise
+        forget_remote(document)
+        return model.generate_content(
+            [prompt, backend.reference(remote_document(document))], **kwargs
+        )
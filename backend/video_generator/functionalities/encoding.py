@@ -0,0 +1,225 @@
+import logging
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from moviepy.config import get_setting
+from readme.metrics import VIDEO_ENCODE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Named encoder presets. Generated videos are slideshows whose picture only
+# changes between slides, so the lower presets can use a low frame rate
+# without any visible difference.
+ENCODER_PRESETS = {
+    "preview": {
+        "fps": 8,
+        "codec": "libx264",
+        "x264_preset": "ultrafast",
+        "crf": 30,
+        "height": 480,
+        "audio_bitrate": "64k",
+    },
+    "standard": {
+        "fps": 12,
+        "codec": "libx264",
+        "x264_preset": "veryfast",
+        "crf": 23,
+        "height": 720,
+        "audio_bitrate": "128k",
+    },
+    "archive": {
+        "fps": 24,
+        "codec": "libx264",
+        "x264_preset": "slow",
+        "crf": 18,
+        "height": 1080,
+        "audio_bitrate": "192k",
+    },
+}
+
+# Segments shorter than this are not worth a separate ffmpeg process.
+MIN_SEGMENT_SECONDS = 10
+
+
+def plan_segments(duration: float, fps: int, workers: int):
+    """
+    Split the timeline into (start, end) ranges aligned to frame boundaries,
+    one per worker at most.
+    """
+    count = max(1, min(workers, math.ceil(duration / MIN_SEGMENT_SECONDS)))
+    frames = math.ceil(duration * fps)
+    frames_per_segment = math.ceil(frames / count)
+
+    segments = []
+    for start_frame in range(0, frames, frames_per_segment):
+        end_frame = min(start_frame + frames_per_segment, frames)
+        segments.append((start_frame / fps, min(end_frame / fps, duration)))
+    return segments
+
+
+def _encode_segment(clip, start, end, segment_file, config, threads):
+    """
+    Encode one video-only segment of the clip to its own file.
+    """
+    partial_file = f"{segment_file}.part.mp4"
+    clip.subclip(start, end).write_videofile(
+        partial_file,
+        fps=config["fps"],
+        codec=config["codec"],
+        preset=config["x264_preset"],
+        audio=False,
+        threads=threads,
+        ffmpeg_params=[
+            "-crf",
+            str(config["crf"]),
+            "-vf",
+            f"scale=-2:{config['height']}",
+            "-pix_fmt",
+            "yuv420p",
+        ],
+        logger=None,
+    )
+    os.replace(partial_file, segment_file)
+    return segment_file
+
+
+def _encode_audio(clip, audio_file, config):
+    partial_file = f"{audio_file}.part.m4a"
+    clip.audio.write_audiofile(
+        partial_file, codec="aac", bitrate=config["audio_bitrate"], logger=None
+    )
+    os.replace(partial_file, audio_file)
+    return audio_file
+
+
+def _concat_segments(segment_files, audio_file, video_output_file, work_dir):
+    """
+    Join encoded segments by stream copy and mux the audio track once.
+    """
+    list_file = os.path.join(work_dir, "segments.txt")
+    with open(list_file, "w", encoding="utf8") as segments:
+        for segment_file in segment_files:
+            segments.write(f"file '{os.path.abspath(segment_file)}'\n")
+
+    command = [
+        get_setting("FFMPEG_BINARY"),
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        list_file,
+    ]
+    if audio_file:
+        command += ["-i", audio_file, "-map", "0:v", "-map", "1:a", "-shortest"]
+    command += ["-c", "copy", "-movflags", "+faststart", video_output_file]
+
+    subprocess.run(command, check=True, capture_output=True)
+
+
+def encode_video(
+    clip,
+    video_output_file: str,
+    preset: str = "standard",
+    workers: int = None,
+    work_dir: str = None,
+):
+    """
+    Encode a MoviePy clip with a named preset. The timeline is split into
+    segments that are encoded in parallel, then joined without re-encoding.
+    Segments already present in `work_dir` (from an interrupted encode of the
+    same clip) are reused. Returns the throughput measured for this encode.
+    """
+    if preset not in ENCODER_PRESETS:
+        raise ValueError(
+            f"Unknown encoder preset '{preset}'. Available presets: {', '.join(ENCODER_PRESETS)}"
+        )
+
+    config = ENCODER_PRESETS[preset]
+    workers = workers or os.cpu_count() or 1
+    segments = plan_segments(clip.duration, config["fps"], workers)
+    threads = max(1, (os.cpu_count() or 1) // len(segments))
+
+    cleanup = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="encode_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    # The preset and segment count determine the segment boundaries, so a
+    # file with the same name always holds the same range.
+    segment_files = [
+        os.path.join(work_dir, f"segment_{preset}_{len(segments)}_{index:03d}.mp4")
+        for index in range(len(segments))
+    ]
+    pending = [
+        (segment_file, start, end)
+        for segment_file, (start, end) in zip(segment_files, segments)
+        if not os.path.exists(segment_file)
+    ]
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=len(pending) + 1) as executor:
+            audio_file = None
+            audio_future = None
+            if clip.audio is not None:
+                audio_file = os.path.join(work_dir, f"audio_{preset}.m4a")
+                if not os.path.exists(audio_file):
+                    audio_future = executor.submit(
+                        _encode_audio, clip, audio_file, config
+                    )
+
+            segment_futures = [
+                executor.submit(
+                    _encode_segment, clip, start, end, segment_file, config, threads
+                )
+                for segment_file, start, end in pending
+            ]
+            for future in segment_futures:
+                future.result()
+
+            if audio_future is not None:
+                audio_future.result()
+
+        _concat_segments(segment_files, audio_file, video_output_file, work_dir)
+    except Exception:
+        VIDEO_ENCODE_SECONDS.observe(
+            time.perf_counter() - started, preset=preset, outcome="error"
+        )
+        raise
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    VIDEO_ENCODE_SECONDS.observe(elapsed, preset=preset, outcome="success")
+    frames = math.ceil(clip.duration * config["fps"])
+    stats = {
+        "preset": preset,
+        "segments": len(segments),
+        "reused_segments": len(segments) - len(pending),
+        "duration": clip.duration,
+        "frames": frames,
+        "elapsed": elapsed,
+        "encode_fps": frames / elapsed if elapsed else 0.0,
+        "realtime_factor": clip.duration / elapsed if elapsed else 0.0,
+    }
+    logger.info(
+        "Encoded %s with preset '%s': %.1fs of video in %.1fs "
+        "(%d segments, %.1f fps, %.2fx realtime)",
+        video_output_file,
+        preset,
+        stats["duration"],
+        elapsed,
+        stats["segments"],
+        stats["encode_fps"],
+        stats["realtime_factor"],
+    )
+    return stats
@@ -0,0 +1,186 @@
+"""
+Page-level text extraction for uploaded documents.
+
+PDFs are read page by page with pdfplumber, PPTX slide by slide with
+python-pptx and DOCX in heading-delimited sections with python-docx, so
+callers can start working on the first chunks of a large textbook before the
+rest is parsed. Extraction runs in a separate process that is killed when it
+takes longer than DOCUMENT_EXTRACTION_TIMEOUT.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+# DOCX has no pages; paragraphs are grouped up to this many characters, and a
+# new chunk starts at every heading.
+DOCX_CHUNK_CHARS = 4000
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+
+def iter_pdf_pages(path: str):
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            # Drop the parsed layout so memory stays flat across pages.
+            page.close()
+
+
+def count_pdf_pages(path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pptx_slides(path: str):
+    from pptx import Presentation
+
+    for slide in Presentation(path).slides:
+        texts = []
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                texts.append(shape.text_frame.text)
+            elif getattr(shape, "has_table", False) and shape.has_table:
+                for row in shape.table.rows:
+                    texts.append(" | ".join(cell.text for cell in row.cells))
+        if slide.has_notes_slide:
+            texts.append(slide.notes_slide.notes_text_frame.text)
+        yield "\n".join(text for text in texts if text.strip())
+
+
+def iter_docx_sections(path: str):
+    from docx import Document
+
+    document = Document(path)
+    chunk, size = [], 0
+    for paragraph in document.paragraphs:
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        is_heading = paragraph.style.name.startswith("Heading")
+        if chunk and (is_heading or size + len(text) > DOCX_CHUNK_CHARS):
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text)
+    if chunk:
+        yield "\n".join(chunk)
+
+    for table in document.tables:
+        yield "\n".join(
+            " | ".join(cell.text for cell in row.cells) for row in table.rows
+        )
+
+
+def iter_legacy_document(path: str):
+    # Binary .doc files have no native Python parser.
+    import textract
+
+    yield textract.process(path).decode("utf-8", errors="replace")
+
+
+EXTRACTORS = {
+    ".pdf": iter_pdf_pages,
+    ".pptx": iter_pptx_slides,
+    ".docx": iter_docx_sections,
+    ".doc": iter_legacy_document,
+}
+
+
+def _iter_chunks_in_process(path: str):
+    extension = os.path.splitext(path)[-1].lower()
+    if extension not in EXTRACTORS:
+        raise ValueError(f"Unsupported document type: {extension}")
+    for chunk in EXTRACTORS[extension](path):
+        if chunk.strip():
+            yield chunk
+
+
+def _extract_into_queue(path: str, chunks):
+    try:
+        for chunk in _iter_chunks_in_process(path):
+            chunks.put(("chunk", chunk))
+        chunks.put(("done", None))
+    except Exception as e:
+        chunks.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def _extraction_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.DOCUMENT_EXTRACTION_PROCESSES)
+    return _slots
+
+
+def iter_document_chunks(path: str, timeout: float = None):
+    """
+    Yield the text of each page (PDF), slide (PPTX) or section (DOCX) as soon
+    as it is extracted. Raises ExtractionTimeout once the caller has waited
+    `timeout` seconds in total (DOCUMENT_EXTRACTION_TIMEOUT by default).
+    """
+    timeout = timeout or settings.DOCUMENT_EXTRACTION_TIMEOUT
+
+    if multiprocessing.current_process().daemon:
+        # Daemonic processes (e.g. prefork Celery workers) cannot start
+        # children, so extract in this process without a timeout.
+        yield from _iter_chunks_in_process(path)
+        return
+
+    with _extraction_slots():
+        context = multiprocessing.get_context("spawn")
+        chunks = context.Queue()
+        process = context.Process(
+            target=_extract_into_queue, args=(path, chunks), daemon=True
+        )
+        process.start()
+        # Only time spent waiting for chunks counts, not the time the caller
+        # spends on the chunks it already has.
+        waited = 0.0
+        try:
+            while True:
+                if waited >= timeout:
+                    raise ExtractionTimeout(
+                        f"Extracting {os.path.basename(path)} took longer than {timeout}s"
+                    )
+                started = time.monotonic()
+                try:
+                    kind, value = chunks.get(timeout=min(1, timeout - waited))
+                except queue.Empty:
+                    if not process.is_alive() and chunks.empty():
+                        raise ValueError(
+                            f"Extraction of {os.path.basename(path)} exited with code {process.exitcode}"
+                        ) from None
+                    continue
+                finally:
+                    waited += time.monotonic() - started
+                if kind == "chunk":
+                    yield value
+                elif kind == "error":
+                    raise ValueError(
+                        f"Could not extract {os.path.basename(path)}: {value}"
+                    )
+                else:
+                    break
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            chunks.close()
+
+
+def extract_text_from_document(doc_path: str) -> str:
+    return "\n\n".join(iter_document_chunks(doc_path))
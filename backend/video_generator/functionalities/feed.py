@@ -0,0 +1,113 @@
+import base64
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from ..models import Video
+
+FEED_VERSION_KEY = "video-feed-version"
+FEED_FIELDS = (
+    "video_id",
+    "title",
+    "description",
+    "video_file",
+    "thumbnail",
+    "duration",
+    "created_at",
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(video: Video) -> str:
+    value = f"{video.created_at.isoformat()}|{video.pk}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, _, pk = value.partition("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def serialize_feed_video(video: Video) -> dict:
+    return {
+        "video_id": str(video.video_id),  # Ensure UUID is converted to string
+        "title": video.title,
+        "description": video.description,
+        "video_file": str(video.video_file.url),  # Convert to string
+        "thumbnail": (
+            str(video.thumbnail.url) if video.thumbnail else None
+        ),  # Handle thumbnail as URL or None
+        "duration": video.duration.total_seconds(),  # Convert timedelta to seconds
+        "created_at": video.created_at.isoformat(),  # Ensure datetime is serialized as ISO format
+    }
+
+
+def _new_version() -> int:
+    return time.time_ns()
+
+
+def feed_version() -> int:
+    return cache.get_or_set(FEED_VERSION_KEY, _new_version, timeout=None)
+
+
+def published_videos_page(cursor: str = None, limit: int = None) -> dict:
+    """
+    One page of published videos, newest first. Pages continue from the
+    (created_at, id) of the previous page's last row, so each page is an
+    index range scan however deep the client scrolls. Pages are cached until
+    a video is saved or deleted.
+    """
+    limit = max(
+        1, min(limit or settings.VIDEO_FEED_PAGE_SIZE, settings.VIDEO_FEED_MAX_PAGE_SIZE)
+    )
+    if cursor:
+        # Validate before building a cache key from client input.
+        created_at, pk = decode_cursor(cursor)
+
+    version = feed_version()
+    cache_key = f"video-feed:{version}:{limit}:{cursor or ''}"
+    page = cache.get(cache_key)
+    if page is not None:
+        return page
+
+    videos = Video.objects.filter(published=True).only(*FEED_FIELDS)
+    if cursor:
+        videos = videos.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    # One extra row tells whether there is a next page.
+    rows = list(videos.order_by("-created_at", "-pk")[: limit + 1])
+
+    page = {
+        "videos": [serialize_feed_video(video) for video in rows[:limit]],
+        "next_cursor": encode_cursor(rows[limit - 1]) if len(rows) > limit else None,
+    }
+    cache.set(cache_key, page, settings.VIDEO_FEED_CACHE_SECONDS)
+    return page
+
+
+def invalidate_feed():
+    """
+    Make every cached feed page stale by moving to a new version.
+    """
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        # The version was evicted; start from one no old page can have.
+        cache.set(FEED_VERSION_KEY, _new_version(), timeout=None)
+
+
+def invalidate_feed_on_change(sender, instance, **kwargs):
+    # Any saved or deleted video may be on a page: published, edited,
+    # unpublished or removed.
+    invalidate_feed()
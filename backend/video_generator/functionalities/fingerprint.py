@@ -0,0 +1,50 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import VideoProcessingJob
+
+
+def request_fingerprint(
+    video_preference, language, content_hash: str = None, text=None
+) -> str:
+    """
+    Hash what determines the generated video: the uploaded document's
+    content hash (or the submitted text), the video preference and the
+    language.
+    """
+    digest = hashlib.sha256()
+    for part in (video_preference or "", language or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    if content_hash:
+        digest.update(b"file\0")
+        digest.update(content_hash.encode("ascii"))
+    else:
+        digest.update(b"text\0")
+        digest.update((text or "").strip().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def find_reusable_job(fingerprint: str):
+    """
+    Return the latest job for the same fingerprint that has produced a video
+    or is still in flight, or None. In-flight jobs older than the job lock
+    timeout are ignored, since their worker has died.
+    """
+    in_flight_since = timezone.now() - timedelta(
+        seconds=settings.VIDEO_JOB_LOCK_TIMEOUT
+    )
+    return (
+        VideoProcessingJob.objects.filter(fingerprint=fingerprint)
+        .filter(
+            Q(status="completed", video__isnull=False)
+            | Q(status__in=("queued", "processing"), created_at__gte=in_flight_since)
+        )
+        .order_by("-created_at")
+        .first()
+    )
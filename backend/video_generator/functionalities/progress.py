@@ -0,0 +1,176 @@
+import json
+import logging
+from contextlib import contextmanager
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.utils import timezone
+
+from readme.metrics import PIPELINE_STAGE_SECONDS
+from ..models import VideoJobStage
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in execution order, with their share of the whole job used
+# to turn stage progress into an overall percentage.
+VIDEO_JOB_STAGES = {
+    "script": 15,
+    "tts": 15,
+    "keywords": 5,
+    "captions": 5,
+    "images": 25,
+    "render": 25,
+    "details": 5,
+    "thumbnail": 5,
+}
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Snapshots outlive the job briefly so late subscribers still see the result.
+PROGRESS_STATE_TTL = 60 * 60 * 24
+
+_redis_client = None
+
+
+def get_redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.PROGRESS_REDIS_URL)
+    return _redis_client
+
+
+def progress_channel(job_id) -> str:
+    return f"video-progress:{job_id}"
+
+
+def progress_state_key(job_id) -> str:
+    return f"video-progress-state:{job_id}"
+
+
+class JobProgress:
+    """
+    Publishes per-stage progress of a video job to Redis and records the
+    timing of each stage. Each event is sent on the job's pub/sub channel and
+    kept as the latest snapshot.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.job_id = str(job.job_id)
+        self.started_at = job.created_at or timezone.now()
+
+    def percent(self, stage: str, fraction: float = 0.0) -> float:
+        total = sum(VIDEO_JOB_STAGES.values())
+        done = 0
+        for name, weight in VIDEO_JOB_STAGES.items():
+            if name == stage:
+                done += weight * min(max(fraction, 0.0), 1.0)
+                break
+            done += weight
+        return round(100 * done / total, 1)
+
+    def eta_seconds(self, percent: float):
+        if percent <= 0:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        return round(elapsed * (100 - percent) / percent)
+
+    def publish(self, status: str, stage: str = None, percent: float = 0.0, **extra):
+        event = {
+            "job_id": self.job_id,
+            "status": status,
+            "stage": stage,
+            "percent": percent,
+            "eta_seconds": (
+                0 if status in TERMINAL_STATUSES else self.eta_seconds(percent)
+            ),
+            **extra,
+        }
+        payload = json.dumps(event, default=str)
+        try:
+            client = get_redis()
+            client.set(progress_state_key(self.job_id), payload, ex=PROGRESS_STATE_TTL)
+            client.publish(progress_channel(self.job_id), payload)
+        except redis.RedisError as e:
+            # Progress is informational; never fail a job because of it.
+            logger.warning("Could not publish progress for %s: %s", self.job_id, e)
+
+    def update(self, stage: str, fraction: float):
+        """
+        Report progress within a stage, e.g. images fetched so far.
+        """
+        self.publish("processing", stage, self.percent(stage, fraction))
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Publish progress around a pipeline stage and record its timing. The
+        caller may set `bytes` and `count` on the yielded record.
+        """
+        record, _ = VideoJobStage.objects.update_or_create(
+            job=self.job,
+            name=name,
+            defaults={
+                "started_at": timezone.now(),
+                "ended_at": None,
+                "succeeded": False,
+                "bytes": None,
+                "count": None,
+            },
+        )
+        self.update(name, 0.0)
+        try:
+            yield record
+            record.succeeded = True
+        finally:
+            record.ended_at = timezone.now()
+            record.save()
+            PIPELINE_STAGE_SECONDS.observe(
+                record.duration.total_seconds(),
+                stage=name,
+                outcome="success" if record.succeeded else "error",
+            )
+        self.update(name, 1.0)
+
+    def finish(self, status: str, **extra):
+        percent = 100.0 if status == "completed" else None
+        self.publish(status, None, percent, **extra)
+
+
+def format_sse(event: dict) -> str:
+    return f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def iter_progress_events(job_id, initial_event: dict):
+    """
+    Yield server-sent events for a job until it completes or fails, starting
+    with the latest snapshot and sending keep-alive comments while idle.
+    """
+    client = aioredis.Redis.from_url(settings.PROGRESS_REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        # Subscribe before reading the snapshot so no event is missed.
+        await pubsub.subscribe(progress_channel(job_id))
+        snapshot = await client.get(progress_state_key(job_id))
+        event = json.loads(snapshot) if snapshot else initial_event
+        yield format_sse(event)
+        if event["status"] in TERMINAL_STATUSES:
+            return
+
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.PROGRESS_HEARTBEAT_SECONDS,
+            )
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+
+            event = json.loads(message["data"])
+            yield format_sse(event)
+            if event["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.reset()
+        await client.aclose()
@@ -0,0 +1,95 @@
+"""
+Backends holding provider-side copies of uploaded documents.
+
+REMOTE_FILE_BACKEND names the backend class. GeminiFileBackend uploads to
+the Gemini Files API; LocalFileBackend only records uploads, so tests and
+offline development can run without it.
+"""
+
+import mimetypes
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+_backends = {}
+
+
+@dataclass
+class RemoteFile:
+    name: str
+    uri: str
+    mime_type: str
+    expires_at: datetime
+
+
+class GeminiFileBackend:
+    def upload(self, path: str, display_name: str) -> RemoteFile:
+        import google.generativeai as genai
+
+        uploaded = genai.upload_file(path, display_name=display_name)
+        return RemoteFile(
+            name=uploaded.name,
+            uri=uploaded.uri,
+            mime_type=uploaded.mime_type,
+            expires_at=getattr(uploaded, "expiration_time", None)
+            or timezone.now() + timedelta(seconds=settings.DOCUMENT_REMOTE_TTL),
+        )
+
+    def reference(self, remote: RemoteFile):
+        # A file_data part only carries the URI, so using a cached handle
+        # needs no request until the prompt itself is sent.
+        from google.generativeai import protos
+
+        return protos.Part(
+            file_data=protos.FileData(file_uri=remote.uri, mime_type=remote.mime_type)
+        )
+
+    def is_missing(self, error: Exception) -> bool:
+        from google.api_core import exceptions
+
+        return isinstance(error, (exceptions.NotFound, exceptions.PermissionDenied))
+
+
+class LocalFileBackend:
+    """
+    Stand-in for the remote service: "uploads" are recorded in `uploads` and
+    their bytes are sent inline with each prompt, read from the local path.
+    """
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload(self, path: str, display_name: str) -> RemoteFile:
+        self.uploads.append(path)
+        return RemoteFile(
+            name=f"local/{len(self.uploads)}",
+            uri=Path(path).resolve().as_uri(),
+            mime_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            expires_at=timezone.now() + timedelta(seconds=settings.DOCUMENT_REMOTE_TTL),
+        )
+
+    def reference(self, remote: RemoteFile):
+        from google.generativeai import protos
+
+        path = url2pathname(urlparse(remote.uri).path)
+        with open(path, "rb") as local_file:
+            data = local_file.read()
+        return protos.Part(
+            inline_data=protos.Blob(mime_type=remote.mime_type, data=data)
+        )
+
+    def is_missing(self, error: Exception) -> bool:
+        return isinstance(error, FileNotFoundError)
+
+
+def get_backend():
+    path = settings.REMOTE_FILE_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
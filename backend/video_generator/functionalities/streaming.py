@@ -0,0 +1,160 @@
+import logging
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+logger = logging.getLogger(__name__)
+
+# Target duration of each HLS segment in seconds. Keyframes are forced on
+# segment boundaries so every rendition can be switched at the same points.
+HLS_SEGMENT_SECONDS = 4
+# Every rendition is encoded as H.264 High@4.0 with AAC-LC audio, which is
+# what the CODECS attribute of the master playlist announces.
+H264_PROFILE = "high"
+H264_LEVEL = "4.0"
+HLS_CODECS = "avc1.640028,mp4a.40.2"
+
+
+def _bitrate_to_bps(bitrate: str) -> int:
+    """
+    Convert an ffmpeg style bitrate such as "800k" or "2M" to bits per second.
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    unit = bitrate[-1].lower()
+    if unit in multipliers:
+        return int(float(bitrate[:-1]) * multipliers[unit])
+    return int(bitrate)
+
+
+def _scaled_width(source_width: int, source_height: int, height: int) -> int:
+    # The width ffmpeg picks for scale=-2:height: the aspect ratio kept and
+    # rounded to an even number.
+    return round(source_width * height / (source_height * 2)) * 2
+
+
+def _encode_rendition(video_file, output_dir, rendition, segment_type):
+    """
+    Transcode the source MP4 into one HLS rendition and return its playlist name.
+    """
+    name = rendition["name"]
+    playlist = f"{name}.m3u8"
+    command = [
+        get_setting("FFMPEG_BINARY"),
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        video_file,
+        "-vf",
+        f"scale=-2:{rendition['height']}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-profile:v",
+        H264_PROFILE,
+        "-level",
+        H264_LEVEL,
+        "-b:v",
+        rendition["video_bitrate"],
+        "-maxrate",
+        rendition["video_bitrate"],
+        "-bufsize",
+        f"{2 * _bitrate_to_bps(rendition['video_bitrate'])}",
+        "-pix_fmt",
+        "yuv420p",
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+        "-c:a",
+        "aac",
+        "-b:a",
+        rendition["audio_bitrate"],
+        "-f",
+        "hls",
+        "-hls_time",
+        str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type",
+        "vod",
+    ]
+    if segment_type == "fmp4":
+        command += [
+            "-hls_segment_type",
+            "fmp4",
+            "-hls_fmp4_init_filename",
+            f"{name}_init.mp4",
+            "-hls_segment_filename",
+            os.path.join(output_dir, f"{name}_%03d.m4s"),
+        ]
+    else:
+        command += [
+            "-hls_segment_type",
+            "mpegts",
+            "-hls_segment_filename",
+            os.path.join(output_dir, f"{name}_%03d.ts"),
+        ]
+    command.append(os.path.join(output_dir, playlist))
+
+    subprocess.run(command, check=True, capture_output=True)
+    return playlist
+
+
+def package_hls(
+    video_file: str, output_dir: str, renditions: list, segment_type: str = "mpegts"
+) -> str:
+    """
+    Produce HLS renditions of an encoded MP4 and a master playlist that lets
+    the player pick a bitrate. Renditions taller than the source are skipped,
+    keeping at least the smallest. Returns the path of the master playlist.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    source_width, source_height = ffmpeg_parse_infos(video_file)["video_size"]
+    smallest = min(renditions, key=lambda rendition: rendition["height"])
+    renditions = [
+        rendition for rendition in renditions if rendition["height"] <= source_height
+    ] or [{**smallest, "height": source_height}]
+
+    with ThreadPoolExecutor(max_workers=len(renditions)) as executor:
+        playlists = list(
+            executor.map(
+                lambda rendition: _encode_rendition(
+                    video_file, output_dir, rendition, segment_type
+                ),
+                renditions,
+            )
+        )
+
+    master_playlist = os.path.join(output_dir, "master.m3u8")
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7" if segment_type == "fmp4" else "#EXT-X-VERSION:3",
+    ]
+    # Lowest bitrate first so players that take the first entry start fast.
+    for rendition, playlist in sorted(
+        zip(renditions, playlists),
+        key=lambda item: _bitrate_to_bps(item[0]["video_bitrate"]),
+    ):
+        bandwidth = _bitrate_to_bps(rendition["video_bitrate"]) + _bitrate_to_bps(
+            rendition["audio_bitrate"]
+        )
+        height = rendition["height"]
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},"
+            f"RESOLUTION={_scaled_width(source_width, source_height, height)}x{height},"
+            f"CODECS=\"{HLS_CODECS}\",NAME=\"{rendition['name']}\""
+        )
+        lines.append(playlist)
+
+    with open(master_playlist, "w", encoding="utf8") as playlist_file:
+        playlist_file.write("\n".join(lines) + "\n")
+
+    logger.info(
+        "Packaged %s into %d HLS renditions at %s",
+        video_file,
+        len(renditions),
+        master_playlist,
+    )
+    return master_playlist
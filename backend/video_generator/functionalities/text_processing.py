@@ -1,19 +1,116 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from typing import List
-import textract
 import google.generativeai as genai
+from django.conf import settings
 from dotenv import load_dotenv, find_dotenv
 import ast
+from readme.metrics import LLM_REQUEST_SECONDS, timed
+from .documents import (
+    IMAGE_EXTENSIONS,
+    document_page_count,
+    generate_with_document,
+    iter_document_pages,
+)
 
 
-def extract_text_from_document(doc_path: str):
-    text = textract.process(doc_path)
-    return text
+def iter_text_windows(pieces, size: int, overlap: int):
+    """
+    Regroup streamed text pieces (pages, slides, summaries) into windows of
+    about `size` characters. Each window repeats the last `overlap`
+    characters of the previous one, so no passage loses its context.
+    """
+    buffer = ""
+    carried = 0
+    for piece in pieces:
+        buffer = f"{buffer}\n\n{piece}" if buffer else piece
+        while len(buffer) >= size:
+            # Prefer to break at a line end in the second half of the window.
+            cut = buffer.rfind("\n", size // 2, size)
+            if cut == -1:
+                cut = size
+            yield buffer[:cut]
+            buffer = buffer[max(cut - overlap, 0) :]
+            carried = min(overlap, cut)
+    if len(buffer) > carried and buffer.strip():
+        yield buffer
+
+
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="script_map")
+def summarize_section(model, section: str, index: int) -> str:
+    prompt = f"""
+        This is part {index + 1} of a longer document that will be turned into an educational video script.
+        Write dense notes on this part only: keep every key concept, definition, formula, date, name and example,
+        in the order they appear and in the document's language. Leave out headers, footers and page numbers.
+        Return the notes only.
+
+        Part {index + 1}:
+        {section}
+        """
+    return model.generate_content([prompt]).text
+
+
+def summarize_sections(model, sections) -> List[str]:
+    """
+    Summarize sections in parallel, submitting each one as soon as the
+    (possibly still streaming) iterator produces it. Keeps document order.
+    """
+    with ThreadPoolExecutor(max_workers=settings.SCRIPT_MAP_CONCURRENCY) as executor:
+        futures = [
+            executor.submit(summarize_section, model, section, index)
+            for index, section in enumerate(sections)
+        ]
+        return [future.result() for future in futures]
 
 
+def condense_document(model, pieces) -> str:
+    """
+    Return the text itself if it fits in one chunk, otherwise the ordered
+    notes on its chunks, condensed again until they fit in one.
+    """
+    windows = iter_text_windows(
+        pieces, settings.SCRIPT_CHUNK_CHARS, settings.SCRIPT_CHUNK_OVERLAP_CHARS
+    )
+    first = next(windows, "")
+    second = next(windows, None)
+    if second is None:
+        return first
+
+    summaries = summarize_sections(model, chain([first, second], windows))
+    while True:
+        notes = "\n\n".join(
+            f"Part {index + 1}:\n{summary}" for index, summary in enumerate(summaries)
+        )
+        if len(notes) <= settings.SCRIPT_CHUNK_CHARS or len(summaries) == 1:
+            return notes
+        summaries = summarize_sections(
+            model, _group_summaries(summaries, settings.SCRIPT_CHUNK_CHARS)
+        )
+
+
+def _group_summaries(summaries: List[str], size: int) -> List[str]:
+    # At least two summaries per group, so every round at least halves them.
+    groups = []
+    for summary in summaries:
+        if groups and (
+            len(groups[-1]) < 2 or sum(map(len, groups[-1])) + len(summary) <= size
+        ):
+            groups[-1].append(summary)
+        else:
+            groups.append([summary])
+    if len(groups) > 1 and len(groups[-1]) < 2:
+        groups[-2].extend(groups.pop())
+    return ["\n\n".join(group) for group in groups]
+
+
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="script")
 def generate_script(
-    video_preference: str, language: str, file_path: str = None, text: str = None
+    video_preference: str, language: str, document=None, text: str = None
 ) -> str:
+    """
+    Write the narration script from text or a stored SourceDocument.
+    """
     load_dotenv(find_dotenv())
     genai.configure(api_key=os.environ["GEMINI_API_KEY"])
     model = genai.GenerativeModel("gemini-1.5-flash")
@@ -39,25 +136,27 @@ def generate_script(
         llm_prompt += f"\n\n<!-- Please make the script in {language}. -->"
 
     if text:
-        # Use text directly if provided
-        llm_prompt += f"\n\nContent:\n{text}"
+        # Use text directly if provided, condensed first if it is long
+        llm_prompt += f"\n\nContent:\n{condense_document(model, [text])}"
         response = model.generate_content([llm_prompt])
     else:
         # Determine the file type
-        file_extension = os.path.splitext(file_path)[-1].lower()
+        file_extension = document.extension
 
-        if file_extension == ".pdf":
-            # Directly upload PDF files
-            pdf = genai.upload_file(file_path)
-            response = model.generate_content([llm_prompt, pdf])
+        if (
+            file_extension == ".pdf"
+            and document_page_count(document) <= settings.SCRIPT_PDF_UPLOAD_MAX_PAGES
+        ):
+            # Pass short PDF files directly
+            response = generate_with_document(model, llm_prompt, document)
 
-        elif file_extension in [".jpg", ".jpeg", ".png"]:
+        elif file_extension in IMAGE_EXTENSIONS:
             # For image files, pass them directly
-            sample_image = genai.upload_file(file_path)
-            response = model.generate_content([llm_prompt, sample_image])
+            response = generate_with_document(model, llm_prompt, document)
 
-        elif file_extension in [".doc", ".docx", ".pptx"]:
-            document_text = extract_text_from_document(file_path)
+        elif file_extension in [".pdf", ".doc", ".docx", ".pptx"]:
+            # Chunks are summarized while later pages are still being extracted.
+            document_text = condense_document(model, iter_document_pages(document))
             llm_prompt += f"\n\nContent:\n{document_text}"
             response = model.generate_content([llm_prompt])
 
@@ -67,6 +166,7 @@ def generate_script(
     return response.text
 
 
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="keywords")
 def generate_keywords(text: str):
     GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
     genai.configure(api_key=GEMINI_API_KEY)
@@ -83,6 +183,7 @@ def generate_keywords(text: str):
     return ast.literal_eval(trimmed_response)
 
 
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="keywords")
 def generate_keywords_fast(text: str):
     GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
     genai.configure(api_key=GEMINI_API_KEY)
@@ -102,6 +203,7 @@ def get_prompts_from_script(script: str) -> List[str]:
     return [script]
 
 
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="answer")
 def generate_answer_from_question(
     question: str = "What are the three states of matter?", speech: str = "formal"
 ):
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import Video
+
+
+def _updated_at_key(video_id) -> str:
+    return f"video-updated-at:{video_id}"
+
+
+def video_updated_at(video_id):
+    """
+    The video's updated_at, or None if it does not exist. Cached and cleared
+    whenever the video is saved, so conditional GETs need no query.
+    """
+    key = _updated_at_key(video_id)
+    updated_at = cache.get(key)
+    if updated_at is None:
+        updated_at = (
+            Video.objects.filter(video_id=video_id)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        cache.set(key, updated_at, settings.VIDEO_CACHE_SECONDS)
+    return updated_at
+
+
+def video_etag(request, video_id):
+    updated_at = video_updated_at(video_id)
+    return f"{video_id}-{updated_at.timestamp()}" if updated_at else None
+
+
+def video_last_modified(request, video_id):
+    return video_updated_at(video_id)
+
+
+def serialize_video(video: Video) -> dict:
+    return {
+        "video_id": str(video.video_id),  # Ensure UUID is converted to string
+        "title": video.title,
+        "description": video.description,
+        "video_file": str(video.video_file.url),  # Convert to string
+        "hls_playlist": (
+            str(video.hls_playlist.url) if video.hls_playlist else None
+        ),  # Adaptive stream, falls back to video_file when missing
+        "thumbnail": (
+            str(video.thumbnail.url) if video.thumbnail else None
+        ),  # Handle thumbnail as URL or None
+        "sprite_sheet": (
+            str(video.sprite_sheet.url) if video.sprite_sheet else None
+        ),
+        "scrub_previews": (
+            str(video.scrub_previews.url) if video.scrub_previews else None
+        ),  # WebVTT index of sprite_sheet tiles for scrub previews
+        "visemes": video.visemes,
+        "duration": video.duration.total_seconds(),  # Convert timedelta to seconds
+        "created_at": video.created_at.isoformat(),  # Ensure datetime is serialized as ISO format
+    }
+
+
+def get_video_data(video_id) -> dict:
+    """
+    Serialized video, cached per version so the visemes are serialized once.
+    Raises Video.DoesNotExist.
+    """
+    updated_at = video_updated_at(video_id)
+    if updated_at is None:
+        raise Video.DoesNotExist
+    key = f"video-data:{video_id}:{updated_at.timestamp()}"
+    data = cache.get(key)
+    if data is None:
+        data = serialize_video(Video.objects.get(video_id=video_id))
+        cache.set(key, data, settings.VIDEO_CACHE_SECONDS)
+    return data
+
+
+def invalidate_video(sender, instance, **kwargs):
+    cache.delete(_updated_at_key(instance.video_id))
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import google.generativeai as genai
 import azure.cognitiveservices.speech as speechsdk
@@ -9,10 +10,17 @@ import aiohttp
 import numpy as np
 from video_generator.functionalities.text_processing import generate_keywords
 from video_generator.functionalities.text_processing import generate_keywords_fast
+from video_generator.functionalities.encoding import encode_video
 from dotenv import load_dotenv, find_dotenv
 import requests
 import random
 import ast
+from readme.metrics import (
+    IMAGE_FETCH_SECONDS,
+    LLM_REQUEST_SECONDS,
+    TTS_REQUEST_SECONDS,
+    timed,
+)
 
 load_dotenv(find_dotenv())
 
@@ -20,6 +28,7 @@ unsplash_api_key = os.environ["UNSPLASH_API_KEY"]
 pixabay_api_key = os.environ["PIXABAY_API_KEY"]
 
 
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="captions")
 def generate_text(text: str, length: int):
     GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
     genai.configure(api_key=GEMINI_API_KEY)
@@ -39,6 +48,7 @@ def generate_text(text: str, length: int):
     return ast.literal_eval(trimmed_response)
 
 
+@timed(IMAGE_FETCH_SECONDS, provider="unsplash")
 async def fetch_image_from_unsplash(session, keyword):
     url = f"https://api.unsplash.com/search/photos?query={keyword}&client_id={unsplash_api_key}"
     async with session.get(url) as response:
@@ -52,6 +62,7 @@ async def fetch_image_from_unsplash(session, keyword):
     return None
 
 
+@timed(IMAGE_FETCH_SECONDS, provider="pixabay")
 async def fetch_image_from_pixabay(session, keyword):
     url = f"https://pixabay.com/api/?key={pixabay_api_key}&q={keyword}&image_type=photo"
     async with session.get(url) as response:
@@ -76,6 +87,7 @@ async def fetch_image_bytes(session, img_url):
 
 
 # Generate Video using Pollination
+@timed(IMAGE_FETCH_SECONDS, provider="pollinations")
 def generate_image_from_pollinations(prompt):
     """
     Fetch image bytes from pollinations.ai based on the prompt.
@@ -118,32 +130,67 @@ async def fetch_images_as_clips_fast(keywords):
     return clips
 
 
+def image_cache_path(cache_dir: str, keyword: str) -> str:
+    digest = hashlib.sha256(keyword.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_dir, f"{digest}.img")
+
+
+def load_image_clip(img_data):
+    img = Image.open(BytesIO(img_data)).convert("RGB")
+    img_np = np.array(img)  # Convert PIL image to NumPy array
+    return ImageClip(img_np).set_duration(5)  # Set duration of each image to 5 seconds
+
+
+def load_image_clips(image_files):
+    """
+    Rebuild clips from images cached by `fetch_images_as_clips`.
+    """
+    clips = []
+    for image_file in image_files:
+        with open(image_file, "rb") as f:
+            clips.append(load_image_clip(f.read()))
+    return clips
+
+
 # pollination
-async def fetch_images_as_clips(keywords):
+async def fetch_images_as_clips(keywords, on_progress=None, cache_dir=None):
     """
     Fetch images from pollinations.ai for the given keywords,
     convert them to in-memory ImageClips, and return the list of ImageClips.
+    `on_progress(done, total)` is called after each keyword if given.
+    With `cache_dir`, downloaded images are kept on disk and reused by later
+    calls instead of being generated again.
     """
     clips = []
-
-    for keyword in keywords:
-        # Get image bytes from pollinations.ai
-        img_data = generate_image_from_pollinations(keyword)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    for index, keyword in enumerate(keywords):
+        cache_file = image_cache_path(cache_dir, keyword) if cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, "rb") as f:
+                img_data = f.read()
+        else:
+            # Get image bytes from pollinations.ai
+            img_data = generate_image_from_pollinations(keyword)
+            if img_data and cache_file:
+                with open(f"{cache_file}.part", "wb") as f:
+                    f.write(img_data)
+                os.replace(f"{cache_file}.part", cache_file)
 
         if img_data:
-            img = Image.open(BytesIO(img_data)).convert("RGB")
-            img_np = np.array(img)  # Convert PIL image to NumPy array
-            img_clip = ImageClip(img_np).set_duration(
-                5
-            )  # Set duration of each image to 5 seconds
-            clips.append(img_clip)
+            clips.append(load_image_clip(img_data))
             print(f"Generated and added image for keyword: {keyword}")
         else:
             print(f"No image found for: {keyword}")
 
+        if on_progress:
+            on_progress(index + 1, len(keywords))
+
     return clips
 
 
+@timed(TTS_REQUEST_SECONDS, provider="azure")
 def generate_speech_and_viseme_from_text(
     text: str,
     audio_output_file: str = "output.wav",
@@ -191,10 +238,15 @@ def generate_speech_and_viseme_from_text(
 
 
 async def generate_video_from_script_fast(
-    script: str, audio_output_file: str, video_output_file: str
+    script: str,
+    audio_output_file: str,
+    video_output_file: str,
+    encoder_preset: str = "standard",
+    encoder_workers: int = None,
 ):
     """
     Fetch images for the given keywords and generate a video that matches the length of the audio.
+    Returns the audio duration and the slide stills, or None if no images were found.
     """
     audio_clip = AudioFileClip(audio_output_file)
     audio_duration = audio_clip.duration  # Get the duration of the audio in seconds
@@ -207,6 +259,7 @@ async def generate_video_from_script_fast(
         clip_duration = audio_duration / num_clips
 
         landscape_clips = []
+        slides = []
         for clip in clips:
             img = clip.get_frame(0)  # Get a frame from the clip
             pil_img = Image.fromarray(img)  # Convert to a PIL Image
@@ -220,42 +273,85 @@ async def generate_video_from_script_fast(
             # Create a new ImageClip from the resized image with the calculated duration
             landscape_clip = ImageClip(resized_array).set_duration(clip_duration)
             landscape_clips.append(landscape_clip)
+            slides.append(resized_array)
 
         # Concatenate the resized landscape clips into a single video
         video_clip = concatenate_videoclips(landscape_clips, method="compose")
 
         # Add the audio to the video
         final_video = video_clip.set_audio(audio_clip)
-        final_video.write_videofile(video_output_file, fps=24)
+        encoding_stats = encode_video(
+            final_video,
+            video_output_file,
+            preset=encoder_preset,
+            workers=encoder_workers,
+        )
         print(f"Video saved as {video_output_file}")
-    else:
-        print("No images to generate video.")
+
+        return {
+            "duration": audio_duration,
+            "slide_duration": clip_duration,
+            "slides": slides,
+            "encoding": encoding_stats,
+        }
+
+    print("No images to generate video.")
+    return None
 
 
 async def generate_video_from_script(
-    script: str, audio_output_file: str, video_output_file: str
+    script: str,
+    audio_output_file: str,
+    video_output_file: str,
+    encoder_preset: str = "standard",
+    encoder_workers: int = None,
 ):
     """
     Fetch images for the given keywords, generate a video with random transitions, and overlay keywords
     at a fixed position (bottom-left or bottom-center) on the images. The video matches the length of the audio.
+    Returns the audio duration and the rendered slide stills, or None if no images were found.
     """
-    
-    audio_clip = AudioFileClip(audio_output_file)
-    audio_duration = audio_clip.duration  
-
-    
     keywords = generate_keywords(script)
     texts = generate_text(script, len(keywords))
 
     # Fetch image clips based on the keywords
     clips = await fetch_images_as_clips(keywords)
 
+    return render_video_from_clips(
+        clips,
+        texts,
+        audio_output_file=audio_output_file,
+        video_output_file=video_output_file,
+        encoder_preset=encoder_preset,
+        encoder_workers=encoder_workers,
+    )
+
+
+def render_video_from_clips(
+    clips,
+    texts,
+    audio_output_file: str,
+    video_output_file: str,
+    encoder_preset: str = "standard",
+    encoder_workers: int = None,
+    encoder_work_dir: str = None,
+):
+    """
+    Overlay the caption texts on the image clips and encode them over the narration audio.
+    Returns the audio duration and the rendered slide stills, or None if there are no clips.
+    Encoded segments are kept in `encoder_work_dir` if given, so a retried
+    render only encodes what is missing.
+    """
+    audio_clip = AudioFileClip(audio_output_file)
+    audio_duration = audio_clip.duration
+
     if clips:
         num_clips = len(clips)
         # Calculate the duration each image should stay on screen based on the audio length
         clip_duration = audio_duration / num_clips
 
         landscape_clips = []
+        slides = []
         for i, clip in enumerate(clips):
             # Get a frame from the clip
             img = clip.get_frame(0)
@@ -302,6 +398,8 @@ async def generate_video_from_script(
             composite_clip = CompositeVideoClip([image_clip, text_clip])
 
             landscape_clips.append(composite_clip)
+            # Keep the rendered still for thumbnails and scrub previews
+            slides.append(composite_clip.get_frame(0))
 
         # Concatenate the clips with random transitions
         video_clip = concatenate_videoclips(landscape_clips, method="compose")
@@ -310,10 +408,24 @@ async def generate_video_from_script(
         final_video = video_clip.set_audio(audio_clip)
 
         # Save the final video with the specified output file name
-        final_video.write_videofile(video_output_file, fps=24)
+        encoding_stats = encode_video(
+            final_video,
+            video_output_file,
+            preset=encoder_preset,
+            workers=encoder_workers,
+            work_dir=encoder_work_dir,
+        )
         print(f"Video saved as {video_output_file}")
-    else:
-        print("No images to generate video.")
+
+        return {
+            "duration": audio_duration,
+            "slide_duration": clip_duration,
+            "slides": slides,
+            "encoding": encoding_stats,
+        }
+
+    print("No images to generate video.")
+    return None
 
 
 def wrap_text(text, max_width, font_size, font_name):
@@ -341,14 +453,75 @@ def wrap_text(text, max_width, font_size, font_name):
     return wrapped_text
 
 
-def generate_thumbnail(video_clip, video_duration, thumbnail_output):
-    frame = video_clip.get_frame(video_duration / 2)
-    thumbnail_image = Image.fromarray(frame)
+def generate_thumbnail(frame, thumbnail_output):
+    """
+    Save a rendered slide still as the video thumbnail.
+    """
+    thumbnail_image = Image.fromarray(frame).convert("RGB")
     thumbnail_image.save(thumbnail_output)
 
     return thumbnail_output
 
 
+def generate_sprite_sheet(frames, sprite_output, tile_width=160, columns=10):
+    """
+    Pack downscaled slide stills into a single grid image for scrub previews.
+    Returns the tile geometry needed to address each still in the sheet.
+    """
+    first_height, first_width = frames[0].shape[:2]
+    tile_height = round(tile_width * first_height / first_width)
+    columns = min(columns, len(frames))
+    rows = -(-len(frames) // columns)
+
+    sprite_sheet = Image.new("RGB", (tile_width * columns, tile_height * rows))
+    for index, frame in enumerate(frames):
+        tile = Image.fromarray(frame).convert("RGB")
+        tile = tile.resize((tile_width, tile_height), Image.Resampling.LANCZOS)
+        sprite_sheet.paste(
+            tile, ((index % columns) * tile_width, (index // columns) * tile_height)
+        )
+    sprite_sheet.save(sprite_output, quality=80)
+
+    return {
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "columns": columns,
+        "count": len(frames),
+    }
+
+
+def _format_vtt_timestamp(seconds: float) -> str:
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def generate_scrub_previews(sprite, sprite_url, slide_duration, vtt_output):
+    """
+    Write a WebVTT index mapping each slide's time range to its tile in the
+    sprite sheet, in the "sprite.jpg#xywh=x,y,w,h" form video players expect.
+    """
+    lines = ["WEBVTT", ""]
+    for index in range(sprite["count"]):
+        x = (index % sprite["columns"]) * sprite["tile_width"]
+        y = (index // sprite["columns"]) * sprite["tile_height"]
+        start = _format_vtt_timestamp(index * slide_duration)
+        end = _format_vtt_timestamp((index + 1) * slide_duration)
+        lines.append(f"{start} --> {end}")
+        lines.append(
+            f"{sprite_url}#xywh={x},{y},{sprite['tile_width']},{sprite['tile_height']}"
+        )
+        lines.append("")
+
+    with open(vtt_output, "w", encoding="utf8") as vtt_file:
+        vtt_file.write("\n".join(lines))
+
+    return vtt_output
+
+
+@timed(LLM_REQUEST_SECONDS, provider="gemini", stage="details")
 def generate_video_details(script: str):
     GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
     genai.configure(api_key=GEMINI_API_KEY)
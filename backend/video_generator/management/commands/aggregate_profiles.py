@@ -0,0 +1,64 @@
+import glob
+import io
+import os
+import pstats
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate sampled profiles from PROFILING_DIR into one collapsed-stack "
+        "file and print the functions with the highest cumulative time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--name",
+            default="",
+            help="Only aggregate profiles whose name starts with this prefix.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=30, help="Number of functions to print."
+        )
+        parser.add_argument(
+            "--output",
+            help="Path of the merged .folded file (default: PROFILING_DIR/<name or all>.folded).",
+        )
+
+    def handle(self, *args, **options):
+        pattern = os.path.join(settings.PROFILING_DIR, f"{options['name']}*.")
+        prof_files = sorted(glob.glob(pattern + "*.prof"))
+        folded_files = sorted(glob.glob(pattern + "*.folded"))
+        if not prof_files:
+            raise CommandError(f"No profiles found in {settings.PROFILING_DIR}")
+
+        stacks = Counter()
+        for folded_file in folded_files:
+            if os.path.basename(folded_file).startswith("merged-"):
+                continue
+            with open(folded_file, encoding="utf8") as folded:
+                for line in folded:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    if stack:
+                        stacks[stack] += int(count)
+
+        output = options["output"] or os.path.join(
+            settings.PROFILING_DIR, f"merged-{options['name'] or 'all'}.folded"
+        )
+        with open(output, "w", encoding="utf8") as merged:
+            for stack, count in stacks.most_common():
+                merged.write(f"{stack} {count}\n")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(*prof_files, stream=stream)
+        stats.sort_stats("cumulative").print_stats(options["top"])
+
+        self.stdout.write(stream.getvalue())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Aggregated {len(prof_files)} profiles; collapsed stacks written to {output}"
+            )
+        )
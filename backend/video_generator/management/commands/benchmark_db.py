@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+
+from video_generator.models import VideoProcessingJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure database throughput under the write pattern of Celery workers "
+        "(concurrent job.save() calls) while other threads read job status."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers", type=int, default=4, help="Concurrent writing threads."
+        )
+        parser.add_argument(
+            "--readers", type=int, default=4, help="Concurrent reading threads."
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=200,
+            help="Operations per thread.",
+        )
+
+    def handle(self, *args, **options):
+        jobs = VideoProcessingJob.objects.bulk_create(
+            VideoProcessingJob(
+                job_id=uuid.uuid4(), status="queued", video_preference="benchmark"
+            )
+            for _ in range(options["writers"])
+        )
+        job_ids = [job.job_id for job in jobs]
+        results = {"writes": [], "reads": [], "errors": []}
+        lock = threading.Lock()
+
+        def write(job_id):
+            job = VideoProcessingJob.objects.get(job_id=job_id)
+            for index in range(options["operations"]):
+                job.status = "processing" if index % 2 else "queued"
+                job.checkpoints = {"step": index}
+                started = time.perf_counter()
+                try:
+                    job.save()
+                    with lock:
+                        results["writes"].append(time.perf_counter() - started)
+                except OperationalError as e:
+                    with lock:
+                        results["errors"].append(str(e))
+
+        def read():
+            for index in range(options["operations"]):
+                started = time.perf_counter()
+                try:
+                    VideoProcessingJob.objects.filter(
+                        job_id=job_ids[index % len(job_ids)]
+                    ).values_list("status", flat=True).first()
+                    with lock:
+                        results["reads"].append(time.perf_counter() - started)
+                except OperationalError as e:
+                    with lock:
+                        results["errors"].append(str(e))
+
+        def run(target, *args):
+            try:
+                target(*args)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=run, args=(write, job_id)) for job_id in job_ids
+        ] + [threading.Thread(target=run, args=(read,)) for _ in range(options["readers"])]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        VideoProcessingJob.objects.filter(job_id__in=job_ids).delete()
+
+        self.stdout.write(f"Database: {connection.vendor} ({connection.settings_dict['NAME']})")
+        for kind in ("writes", "reads"):
+            latencies = sorted(results[kind])
+            if not latencies:
+                continue
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[int(len(latencies) * 0.95)] * 1000
+            self.stdout.write(
+                f"{kind}: {len(latencies) / elapsed:.0f}/s, "
+                f"p50 {p50:.1f} ms, p95 {p95:.1f} ms"
+            )
+
+        if results["errors"]:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{len(results['errors'])} operations failed, "
+                    f"e.g. {results['errors'][0]}"
+                )
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"No errors in {elapsed:.1f}s"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("video_generator", "0005_remove_videoprocessingjob_document_job_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="video",
+            name="hls_playlist",
+            field=models.FileField(blank=True, null=True, upload_to=""),
+        ),
+    ]
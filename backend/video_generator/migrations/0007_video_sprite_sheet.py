@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("video_generator", "0006_video_hls_playlist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="video",
+            name="sprite_sheet",
+            field=models.ImageField(blank=True, null=True, upload_to=""),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("video_generator", "0007_video_sprite_sheet"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="video",
+            name="scrub_previews",
+            field=models.FileField(blank=True, null=True, upload_to=""),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("video_generator", "0008_video_scrub_previews"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VideoJobStage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=32)),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField(blank=True, null=True)),
+                ("succeeded", models.BooleanField(default=False)),
+                ("bytes", models.BigIntegerField(blank=True, null=True)),
+                ("count", models.IntegerField(blank=True, null=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stages",
+                        to="video_generator.videoprocessingjob",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["name", "-ended_at"], name="video_gener_name_e63afb_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="videojobstage",
+            constraint=models.UniqueConstraint(
+                fields=("job", "name"), name="unique_job_stage"
+            ),
+        ),
+    ]
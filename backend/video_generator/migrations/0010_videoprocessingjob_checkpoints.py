@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0009_videojobstage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprocessingjob',
+            name='checkpoints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='videoprocessingjob',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0010_videoprocessingjob_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprocessingjob',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0011_videoprocessingjob_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprocessingjob',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='video_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='videoprocessingjob',
+            index=models.Index(fields=['status', 'created_at'], name='video_gener_status_a9a649_idx'),
+        ),
+    ]
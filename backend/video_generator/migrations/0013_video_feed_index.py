@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0012_videoprocessingjob_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['published', '-created_at', '-id'], name='video_gener_publish_b98663_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:33
+
+import django.db.models.deletion
+import video_generator.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0014_video_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to=video_generator.models.upload_to_content_hash)),
+                ('original_name', models.CharField(max_length=255)),
+                ('extension', models.CharField(max_length=16)),
+                ('size', models.BigIntegerField()),
+                ('text', models.TextField(blank=True, null=True)),
+                ('page_offsets', models.JSONField(blank=True, null=True)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+                ('remote_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('remote_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='videoprocessingjob',
+            name='document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='video_jobs', to='video_generator.sourcedocument'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('video_generator', '0015_sourcedocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcedocument',
+            name='remote_mime_type',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='sourcedocument',
+            name='remote_uri',
+            field=models.URLField(blank=True, max_length=512, null=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from datetime import datetime
 import os
 import uuid
+from django.conf import settings
 from django.db import models
 
 
@@ -18,9 +19,63 @@ def upload_to_unique_filename(instance, filename):
     return os.path.join("uploaded_documents", unique_filename)
 
 
+def upload_to_content_hash(instance, filename):
+    # Identical uploads share one file, named after the hash of its bytes.
+    return os.path.join("documents", f"{instance.content_hash}{instance.extension}")
+
+
+class SourceDocument(models.Model):
+    """
+    An uploaded document stored once per distinct content, with its
+    extracted text and the handle of its copy on the LLM provider, so video
+    and quiz generation never extract or upload the same file twice.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=upload_to_content_hash)
+    original_name = models.CharField(max_length=255)
+    extension = models.CharField(max_length=16)
+    size = models.BigIntegerField()
+    # Text of all pages (slides, sections) joined by PAGE_SEPARATOR, and the
+    # offset in `text` where each page starts. Null until extracted.
+    text = models.TextField(null=True, blank=True)
+    page_offsets = models.JSONField(null=True, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+    # Provider-side copy of the file (e.g. a Gemini Files API name and URI)
+    # and when the provider deletes it.
+    remote_name = models.CharField(max_length=255, null=True, blank=True)
+    remote_uri = models.URLField(max_length=512, null=True, blank=True)
+    remote_mime_type = models.CharField(max_length=100, null=True, blank=True)
+    remote_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    PAGE_SEPARATOR = "\n\n"
+
+    def __str__(self):
+        return f"{self.original_name} ({self.content_hash[:12]})"
+
+    @property
+    def pages(self):
+        if self.text is None:
+            return None
+        ends = self.page_offsets[1:] + [len(self.text) + len(self.PAGE_SEPARATOR)]
+        return [
+            self.text[start : end - len(self.PAGE_SEPARATOR)]
+            for start, end in zip(self.page_offsets, ends)
+        ]
+
+
 class VideoProcessingJob(models.Model):
     job_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     file = models.FileField(upload_to=upload_to_unique_filename, null=True, blank=True)
+    document = models.ForeignKey(
+        SourceDocument,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="video_jobs",
+    )
     script = models.TextField(null=True, blank=True)
     status = models.CharField(
         max_length=50,
@@ -33,8 +88,25 @@ class VideoProcessingJob(models.Model):
     )
     video_preference = models.TextField()
     language = models.TextField(null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="video_jobs",
+    )
+    # Client-supplied Idempotency-Key; a repeated submission returns this job.
+    dedup_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # Hash of the source document or text, preference and language, used to
+    # hand identical requests the same job.
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    # Outputs of completed pipeline stages, keyed by stage name.
+    checkpoints = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
     def to_dict(self):
         return {
             "id": str(self.job_id),
@@ -42,6 +114,38 @@ class VideoProcessingJob(models.Model):
             "status": self.status,
         }
 
+    def save_checkpoint(self, stage: str, output):
+        self.checkpoints[stage] = output
+        self.save(update_fields=["checkpoints"])
+
+
+class VideoJobStage(models.Model):
+    job = models.ForeignKey(
+        VideoProcessingJob, on_delete=models.CASCADE, related_name="stages"
+    )
+    name = models.CharField(max_length=32)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+    succeeded = models.BooleanField(default=False)
+    bytes = models.BigIntegerField(null=True, blank=True)
+    count = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["started_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["job", "name"], name="unique_job_stage")
+        ]
+        indexes = [models.Index(fields=["name", "-ended_at"])]
+
+    @property
+    def duration(self):
+        if self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
+
+    def __str__(self):
+        return f"{self.job.job_id} {self.name}"
+
 
 class Video(models.Model):
     video_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -49,11 +153,19 @@ class Video(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     video_file = models.FileField()
+    hls_playlist = models.FileField(null=True, blank=True)
     thumbnail = models.ImageField(null=True, blank=True)
+    sprite_sheet = models.ImageField(null=True, blank=True)
+    scrub_previews = models.FileField(null=True, blank=True)
     visemes = models.JSONField(null=True, blank=True)
     duration = models.DurationField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=False)
 
+    class Meta:
+        # Serves the published feed's keyset pagination (feed.py).
+        indexes = [models.Index(fields=["published", "-created_at", "-id"])]
+
     def __str__(self):
         return str(self.title)
@@ -1,60 +1,112 @@
 from datetime import timedelta
 import os
 import json
+import shutil
 import uuid
 import asyncio
 import logging
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from celery import shared_task
-from moviepy.editor import VideoFileClip
+from readme.profiling import profiled
 
 from .models import VideoProcessingJob, Video
+from .functionalities.checkpoints import job_lock, job_work_dir
+from .functionalities.documents import store_document
+from .functionalities.progress import JobProgress
 from .functionalities.text_processing import (
+    generate_keywords,
     generate_script,
 )
+from .functionalities.streaming import package_hls
 from .functionalities.video_synthesis import (
+    fetch_images_as_clips,
     generate_speech_and_viseme_from_text,
+    generate_scrub_previews,
+    generate_sprite_sheet,
+    generate_text,
     generate_thumbnail,
     generate_video_details,
-    generate_video_from_script,
+    image_cache_path,
+    load_image_clips,
+    render_video_from_clips,
 )
 
 
-@shared_task
+def _retry_when_locked(task):
+    # The lock is held by a delivery that is still running, which may take
+    # up to VIDEO_JOB_LOCK_TIMEOUT, or by a worker that died, whose lock
+    # expires within VIDEO_JOB_LOCK_TTL.
+    return task.retry(
+        countdown=settings.VIDEO_JOB_LOCK_RETRY_SECONDS,
+        max_retries=settings.VIDEO_JOB_LOCK_TIMEOUT
+        // settings.VIDEO_JOB_LOCK_RETRY_SECONDS,
+    )
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+@profiled("generate_script_task")
 def generate_script_task(
-    job_id: uuid.UUID, video_preference: str, language: str, text: str = None
+    self, job_id: uuid.UUID, video_preference: str, language: str, text: str = None
 ):
+    with job_lock(job_id) as acquired:
+        if not acquired:
+            raise _retry_when_locked(self)
+        _generate_script(job_id, video_preference, language, text)
+
+
+def _generate_script(job_id, video_preference, language, text):
     job = VideoProcessingJob.objects.get(job_id=job_id)
+    if job.script:
+        # Redelivered after the script was saved; the chain continues.
+        return
     job.status = "processing"
     job.save()
+    progress = JobProgress(job)
 
     try:
-        if text:
-            script = generate_script(
-                text=text, video_preference=video_preference, language=language
-            )
-        else:
-            file_path = job.file.path
-            script = generate_script(
-                file_path=file_path,
-                video_preference=video_preference,
-                language=language,
-            )
+        with progress.stage("script") as stage:
+            if text:
+                script = generate_script(
+                    text=text, video_preference=video_preference, language=language
+                )
+            else:
+                if job.document is None:
+                    # Jobs queued before uploads went to the document store.
+                    job.document = store_document(job.file)
+                script = generate_script(
+                    document=job.document,
+                    video_preference=video_preference,
+                    language=language,
+                )
+            stage.bytes = len(script.encode("utf-8"))
 
         job.script = script
 
     except Exception as e:
         job.status = "failed"
         job.script = None
+        progress.finish("failed")
         logging.error("Error generating script: %s", {str(e)})
 
     finally:
         job.save()
 
 
-@shared_task
-def process_video_task(video_job_id):
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+@profiled("process_video_task")
+def process_video_task(self, video_job_id):
+    with job_lock(video_job_id) as acquired:
+        if not acquired:
+            raise _retry_when_locked(self)
+        return _process_video(video_job_id)
+
+
+def _process_video(video_job_id):
+    """
+    Run the video pipeline for a job. Each stage's output is checkpointed on
+    the job, so a redelivered task resumes after the last completed stage.
+    """
     try:
         video_job = VideoProcessingJob.objects.get(job_id=video_job_id)
     except ObjectDoesNotExist:
@@ -64,6 +116,18 @@ def process_video_task(video_job_id):
             "message": f"No VideoProcessingJob found with id {video_job_id}",
         }
 
+    if video_job.status == "completed":
+        return
+    if Video.objects.filter(video_job=video_job).exists():
+        # The worker died after creating the video but before saving the job.
+        video_job.status = "completed"
+        video_job.save()
+        return
+
+    progress = JobProgress(video_job)
+    checkpoints = video_job.checkpoints
+    work_dir = job_work_dir(video_job_id)
+
     # Set up paths to save audio and video
     audio_output_file = os.path.join(
         settings.MEDIA_ROOT, "temp_asset", f"{video_job_id}.wav"
@@ -76,35 +140,131 @@ def process_video_task(video_job_id):
     os.makedirs(os.path.dirname(audio_output_file), exist_ok=True)
 
     try:
-        visemes = generate_speech_and_viseme_from_text(
-            text=video_job.script, audio_output_file=audio_output_file
-        )
+        if "tts" not in checkpoints or not os.path.exists(audio_output_file):
+            with progress.stage("tts") as stage:
+                visemes = generate_speech_and_viseme_from_text(
+                    text=video_job.script, audio_output_file=audio_output_file
+                )
+                stage.bytes = os.path.getsize(audio_output_file)
+                stage.count = len(visemes or [])
+            video_job.save_checkpoint("tts", {"visemes": visemes})
+        visemes = checkpoints["tts"]["visemes"]
+
+        if "keywords" not in checkpoints:
+            with progress.stage("keywords") as stage:
+                keywords = generate_keywords(video_job.script)
+                stage.count = len(keywords)
+            video_job.save_checkpoint("keywords", keywords)
+        keywords = checkpoints["keywords"]
+
+        if "captions" not in checkpoints:
+            with progress.stage("captions") as stage:
+                texts = generate_text(video_job.script, len(keywords))
+                stage.count = len(texts)
+            video_job.save_checkpoint("captions", texts)
+        texts = checkpoints["captions"]
+
+        image_dir = os.path.join(work_dir, "images")
+        image_files = checkpoints.get("images")
+        if image_files and all(os.path.exists(path) for path in image_files):
+            clips = load_image_clips(image_files)
+        else:
+            with progress.stage("images") as stage:
+                clips = asyncio.run(
+                    fetch_images_as_clips(
+                        keywords,
+                        on_progress=lambda done, total: progress.update(
+                            "images", done / total
+                        ),
+                        cache_dir=image_dir,
+                    )
+                )
+                stage.count = len(clips)
+            video_job.save_checkpoint(
+                "images",
+                [
+                    path
+                    for path in (
+                        image_cache_path(image_dir, keyword) for keyword in keywords
+                    )
+                    if os.path.exists(path)
+                ],
+            )
 
-        asyncio.run(
-            generate_video_from_script(
-                script=video_job.script,
+        with progress.stage("render") as stage:
+            # Not checkpointed: the slide stills are needed below, so the
+            # render runs again on resume, picking up the segments encoded
+            # before a crash from the work dir.
+            render = render_video_from_clips(
+                clips,
+                texts,
                 audio_output_file=audio_output_file,
                 video_output_file=video_output_file,
+                encoder_preset=settings.VIDEO_ENCODER_PRESET,
+                encoder_workers=settings.VIDEO_ENCODER_WORKERS,
+                encoder_work_dir=os.path.join(work_dir, "encode"),
             )
-        )
 
-        if os.path.exists(video_output_file):
+            hls_playlist = checkpoints.get("hls")
+            if render and settings.VIDEO_HLS_ENABLED and not hls_playlist:
+                hls_folder = os.path.join("generated_videos", "hls", str(video_job_id))
+                try:
+                    package_hls(
+                        video_file=video_output_file,
+                        output_dir=os.path.join(settings.MEDIA_ROOT, hls_folder),
+                        renditions=settings.VIDEO_HLS_RENDITIONS,
+                        segment_type=settings.VIDEO_HLS_SEGMENT_TYPE,
+                    )
+                    hls_playlist = os.path.join(hls_folder, "master.m3u8")
+                    video_job.save_checkpoint("hls", hls_playlist)
+                except Exception as e:
+                    # The faststart MP4 is still playable, so HLS is best effort.
+                    logging.error("Error packaging HLS renditions: %s", {str(e)})
+
+            if render:
+                stage.bytes = os.path.getsize(video_output_file)
+                stage.count = len(render["slides"])
+
+        if render and os.path.exists(video_output_file):
             video_id = uuid.uuid4()
-            try:
-                video_details = generate_video_details(video_job)
-                video_details = json.loads(video_details)
-            except Exception:
-                video_details = {}
-
-            video_clip = VideoFileClip(video_output_file)
-            video_duration = video_clip.duration
-            thumbnail_output = os.path.join(
-                settings.MEDIA_ROOT, "thumbnails", f"{video_job_id}.jpg"
-            )
-            os.makedirs(os.path.dirname(thumbnail_output), exist_ok=True)
+            if "details" not in checkpoints:
+                with progress.stage("details"):
+                    try:
+                        video_details = generate_video_details(video_job)
+                        video_details = json.loads(video_details)
+                    except Exception:
+                        video_details = {}
+                video_job.save_checkpoint("details", video_details)
+            video_details = checkpoints["details"]
 
-            # Create video instance with video duration and thumbnail
-            generate_thumbnail(video_clip, video_duration, thumbnail_output)
+            # The audio length is the video length, and the slide stills are
+            # still in memory, so the finished MP4 never has to be decoded.
+            video_duration = render["duration"]
+            slides = render["slides"]
+            thumbnail_file = os.path.join("thumbnails", f"{video_job_id}.jpg")
+            sprite_file = os.path.join("thumbnails", f"{video_job_id}_sprite.jpg")
+            scrub_file = os.path.join("thumbnails", f"{video_job_id}_scrub.vtt")
+            os.makedirs(os.path.join(settings.MEDIA_ROOT, "thumbnails"), exist_ok=True)
+
+            with progress.stage("thumbnail") as stage:
+                generate_thumbnail(
+                    slides[len(slides) // 2],
+                    os.path.join(settings.MEDIA_ROOT, thumbnail_file),
+                )
+                sprite = generate_sprite_sheet(
+                    slides, os.path.join(settings.MEDIA_ROOT, sprite_file)
+                )
+                # The sprite sits next to the index, so a relative URL resolves.
+                generate_scrub_previews(
+                    sprite,
+                    os.path.basename(sprite_file),
+                    render["slide_duration"],
+                    os.path.join(settings.MEDIA_ROOT, scrub_file),
+                )
+                stage.bytes = os.path.getsize(
+                    os.path.join(settings.MEDIA_ROOT, sprite_file)
+                )
+                stage.count = sprite["count"]
 
             video = Video.objects.create(
                 video_id=video_id,
@@ -112,15 +272,25 @@ def process_video_task(video_job_id):
                 title=video_details.get("title", ""),
                 description=video_details.get("description", ""),
                 video_file=os.path.join("generated_videos", f"{video_job_id}.mp4"),
-                thumbnail=thumbnail_output,
+                hls_playlist=hls_playlist,
+                thumbnail=thumbnail_file,
+                sprite_sheet=sprite_file,
+                scrub_previews=scrub_file,
                 visemes=visemes,
                 duration=timedelta(seconds=video_duration),
             )
+
             video_job.status = "completed"
             video_job.file = os.path.join("generated_videos", f"{video_job_id}.mp4")
+            progress.finish("completed", video_id=video.video_id)
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            video_job.status = "failed"
+            progress.finish("failed")
 
     except Exception as e:
         video_job.status = "failed"
+        progress.finish("failed")
         logging.error("Error generating video: %s", {str(e)})
 
     finally:
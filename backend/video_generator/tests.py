@@ -1,3 +1,62 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from .functionalities import documents
+from .functionalities.documents import generate_with_document, store_document
+from .functionalities.remote_files import get_backend
+
+LOCAL_BACKEND = "video_generator.functionalities.remote_files.LocalFileBackend"
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, contents, **kwargs):
+        self.calls.append(contents)
+        return mock.Mock(text="ok")
+
+
+@override_settings(REMOTE_FILE_BACKEND=LOCAL_BACKEND)
+class LocalFileBackendTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # The upload lock needs Redis; a local lock stands in for it.
+        redis_patch = mock.patch.object(documents, "get_redis")
+        redis_patch.start().return_value.lock.return_value.acquire.return_value = True
+        self.addCleanup(redis_patch.stop)
+
+        self.content = b"%PDF-1.4 test document"
+        self.document = store_document(
+            SimpleUploadedFile("notes.pdf", self.content, "application/pdf")
+        )
+        get_backend().uploads.clear()
+
+    def test_document_is_sent_inline(self):
+        model = FakeModel()
+
+        response = generate_with_document(model, "Summarize", self.document)
+
+        self.assertEqual(response.text, "ok")
+        prompt, part = model.calls[0]
+        self.assertEqual(prompt, "Summarize")
+        self.assertEqual(part.inline_data.mime_type, "application/pdf")
+        self.assertEqual(part.inline_data.data, self.content)
+
+    def test_upload_is_reused(self):
+        model = FakeModel()
+
+        generate_with_document(model, "First", self.document)
+        generate_with_document(model, "Second", self.document)
+
+        self.assertEqual(len(get_backend().uploads), 1)
+        self.assertEqual(len(model.calls), 2)
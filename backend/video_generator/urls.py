@@ -10,6 +10,10 @@ urlpatterns = [
         "video-status/<uuid:video_job_id>/",
         views.check_video_generation_status,
     ),
+    path(
+        "video-progress/<uuid:video_job_id>/",
+        views.stream_video_progress,
+    ),
     path(
         "publish-video/<uuid:video_id>/",
         views.publish_video,
@@ -5,20 +5,60 @@ from datetime import timedelta
 import json
 
 from django.conf import settings
-from django.http import HttpRequest, HttpResponse
+from django.db import IntegrityError
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from celery import chain
+from readme.profiling import profiled
 from .functionalities.video_synthesis import (
     generate_speech_and_viseme_from_text,
 )
-from .functionalities.text_processing import generate_answer_from_question, extract_text_from_document
+from .functionalities.text_processing import generate_answer_from_question
+from .functionalities.admission import (
+    ACTIVE_STATUSES,
+    check_admission,
+    estimated_start_seconds,
+    queue_position,
+)
+from .functionalities.feed import (
+    InvalidCursor,
+    feed_version,
+    published_videos_page,
+)
+from .functionalities.documents import store_document, upload_content_hash
+from .functionalities.fingerprint import find_reusable_job, request_fingerprint
+from .functionalities.progress import iter_progress_events
+from .functionalities.video_cache import (
+    get_video_data,
+    video_etag,
+    video_last_modified,
+)
 from .models import VideoProcessingJob, Video
 from .tasks import generate_script_task, process_video_task
 
 accepted_formats = [".pdf", ".doc", ".docx", ".pptx", ".jpg", ".jpeg", ".png"]
+
+
+def _existing_job_response(
+    job: VideoProcessingJob, message: str = "This request was already submitted."
+):
+    return Response(
+        {
+            "status": "success",
+            "message": message,
+            "job_id": job.job_id,
+            "job_status": job.status,
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
 @api_view(["POST"])
+@profiled()
 def generate_video(request: HttpRequest):
     file = request.FILES.get("file")
     text = request.data.get("text")
@@ -56,18 +96,66 @@ def generate_video(request: HttpRequest):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    # A retried submission with the same Idempotency-Key gets the original
+    # job back instead of rendering the video twice.
+    dedup_key = request.headers.get("Idempotency-Key") or None
+    if dedup_key:
+        existing_job = VideoProcessingJob.objects.filter(dedup_key=dedup_key).first()
+        if existing_job:
+            return _existing_job_response(existing_job)
+
+    # Identical requests (same document or text, preference and language)
+    # share one job unless the client opts out with deduplicate=false.
+    content_hash = upload_content_hash(file) if file else None
+    fingerprint = request_fingerprint(
+        video_preference, language, content_hash=content_hash, text=text
+    )
+    if str(request.data.get("deduplicate", "true")).lower() != "false":
+        reusable_job = find_reusable_job(fingerprint)
+        if reusable_job:
+            return _existing_job_response(
+                reusable_job, "An identical video has already been requested."
+            )
+
+    user = request.user if request.user.is_authenticated else None
+    rejection = check_admission(user)
+    if rejection:
+        return Response(
+            {
+                "status": "error",
+                "message": rejection["message"],
+                "estimatedStartSeconds": rejection["retry_after"],
+            },
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(rejection["retry_after"])},
+        )
+
     try:
+        # Stored only now that a job will be created. Identical uploads share
+        # one stored document, so its extracted text and uploaded copy are
+        # reused by every job and quiz made from it.
+        document = store_document(file, content_hash) if file else None
+
         # Create a unique job ID for this process
         job_id = uuid.uuid4()
 
         # Save the job details to the database (initial status: queued)
-        processing_job = VideoProcessingJob.objects.create(
-            job_id=job_id,
-            file=file if file else None,
-            status="queued",
-            video_preference=video_preference,
-            language=language,
-        )
+        try:
+            processing_job = VideoProcessingJob.objects.create(
+                job_id=job_id,
+                document=document,
+                status="queued",
+                video_preference=video_preference,
+                language=language,
+                dedup_key=dedup_key,
+                fingerprint=fingerprint,
+                user=user,
+            )
+        except IntegrityError:
+            # A concurrent request with the same key created the job first.
+            return _existing_job_response(
+                VideoProcessingJob.objects.get(dedup_key=dedup_key)
+            )
 
         # Trigger a chain of asynchronous Celery tasks
         chain(
@@ -101,6 +189,7 @@ def generate_video(request: HttpRequest):
 
 
 @api_view(["GET"])
+@profiled()
 def check_video_generation_status(request, video_job_id):
     try:
         video_job = VideoProcessingJob.objects.get(job_id=video_job_id)
@@ -115,6 +204,17 @@ def check_video_generation_status(request, video_job_id):
                 status=status.HTTP_200_OK,
             )
 
+        if video_job.status in ACTIVE_STATUSES:
+            position = queue_position(video_job)
+            return Response(
+                {
+                    "status": video_job.status,
+                    "queuePosition": position,
+                    "estimatedStartSeconds": estimated_start_seconds(position),
+                },
+                status=status.HTTP_200_OK,
+            )
+
         return Response({"status": video_job.status}, status=status.HTTP_200_OK)
 
     except VideoProcessingJob.DoesNotExist:
@@ -126,12 +226,46 @@ def check_video_generation_status(request, video_job_id):
         )
 
 
+@require_GET
+async def stream_video_progress(request, video_job_id):
+    """
+    Server-sent events with per-stage progress and ETA for a video job.
+    Needs the ASGI application (readme/asgi.py) to stream without buffering.
+    """
+    video_job = await VideoProcessingJob.objects.filter(job_id=video_job_id).afirst()
+    if video_job is None:
+        return JsonResponse({"error": "Job not found."}, status=404)
+
+    # Used when no progress has been published yet (or it has expired).
+    initial_event = {
+        "job_id": str(video_job.job_id),
+        "status": video_job.status,
+        "stage": None,
+        "percent": 100.0 if video_job.status == "completed" else 0.0,
+        "eta_seconds": None,
+    }
+    if video_job.status == "completed":
+        initial_event["video_id"] = await Video.objects.filter(
+            video_job=video_job
+        ).values_list("video_id", flat=True).afirst()
+
+    response = StreamingHttpResponse(
+        iter_progress_events(video_job.job_id, initial_event),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @api_view(["POST"])
+@profiled()
 def publish_video(request, video_id):
     try:
         # Fetch the video processing job
         video = Video.objects.get(video_id=video_id)
         video.published = True
+        # Saving moves the feed to a new version (see apps.py).
         video.save()
 
         return Response(
@@ -152,24 +286,17 @@ def publish_video(request, video_id):
 
 
 @api_view(["GET"])
+@condition(etag_func=video_etag, last_modified_func=video_last_modified)
+@profiled()
 def get_video(request, video_id):
     try:
-        video = Video.objects.get(video_id=video_id)
-
-        video_data = {
-            "video_id": str(video.video_id),  # Ensure UUID is converted to string
-            "title": video.title,
-            "description": video.description,
-            "video_file": str(video.video_file.url),  # Convert to string
-            "thumbnail": (
-                str(video.thumbnail.url) if video.thumbnail else None
-            ),  # Handle thumbnail as URL or None
-            "visemes": video.visemes,
-            "duration": video.duration.total_seconds(),  # Convert timedelta to seconds
-            "created_at": video.created_at.isoformat(),  # Ensure datetime is serialized as ISO format
-        }
-
-        return Response({"video": video_data}, status=status.HTTP_200_OK)
+        video_data = get_video_data(video_id)
+        response = Response({"video": video_data}, status=status.HTTP_200_OK)
+        # Clients revalidate with If-None-Match and usually get a 304.
+        patch_cache_control(
+            response, public=True, max_age=settings.API_CACHE_MAX_AGE
+        )
+        return response
 
     except Video.DoesNotExist:
         return Response(
@@ -181,36 +308,41 @@ def get_video(request, video_id):
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _feed_etag(request):
+    # Saving or deleting any video moves the feed to a new version.
+    return "feed-{}-{}-{}".format(
+        feed_version(),
+        request.GET.get("limit", ""),
+        request.GET.get("cursor", ""),
+    )
+
+
 @api_view(["GET"])
+@condition(etag_func=_feed_etag)
+@profiled()
 def get_all_published_videos(request):
+    """
+    Published videos, newest first, one page at a time. Pass the returned
+    next_cursor as ?cursor= to get the following page; it is null on the last.
+    """
     try:
-        # Get all published videos
-        videos = Video.objects.filter(published=True)
-
-        # Create a list of video data dictionaries
-        videos_data = [
-            {
-                "video_id": str(video.video_id),  # Ensure UUID is converted to string
-                "title": video.title,
-                "description": video.description,
-                "video_file": str(video.video_file.url),  # Convert to string
-                "thumbnail": (
-                    str(video.thumbnail.url) if video.thumbnail else None
-                ),  # Handle thumbnail as URL or None
-                "duration": video.duration.total_seconds(),  # Convert timedelta to seconds
-                "created_at": video.created_at.isoformat(),  # Ensure datetime is serialized as ISO format
-            }
-            for video in videos
-        ]
-
-        return Response({"videos": videos_data}, status=status.HTTP_200_OK)
+        limit = int(request.query_params.get("limit") or 0) or None
+        page = published_videos_page(request.query_params.get("cursor"), limit)
+        response = Response(page, status=status.HTTP_200_OK)
+        patch_cache_control(
+            response, public=True, max_age=settings.API_CACHE_MAX_AGE
+        )
+        return response
 
+    except (InvalidCursor, ValueError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logging.error("Error fetching videos: %s", e)
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(["POST"])
+@profiled()
 def answer_question(request):
     question = request.data.get("question")
     speech = request.data.get("speech")
@@ -227,6 +359,7 @@ def answer_question(request):
 
 
 @api_view(["POST"])
+@profiled()
 def get_tts(request: HttpRequest):
     text = request.data.get("text")
     teacher = request.data.get("teacher")
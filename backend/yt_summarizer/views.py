@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from .serializers import YoutubeSummarizerSerializer
 from .youtube_summarizer import (
     get_video_id, 
@@ -12,6 +15,7 @@ from .youtube_summarizer import (
     SUMMARY_LENGTHS
 )
 from typing import Dict, Any
+import hashlib
 import logging
 from urllib.parse import urlparse
 import json
@@ -19,6 +23,31 @@ import json
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Served by GET; it only changes with a deploy, so it is built once.
+API_INFO = {
+    "name": "YouTube Video Summarizer API",
+    "version": "2.0",
+    "description": "Summarizes YouTube videos using transcripts with language and length options",
+    "supported_languages": SUPPORTED_LANGUAGES,
+    "summary_lengths": {
+        length: params['description']
+        for length, params in SUMMARY_LENGTHS.items()
+    },
+    "endpoints": {
+        "POST /api/summarize/": {
+            "description": "Summarize a YouTube video",
+            "parameters": {
+                "youtube_url": "URL of the YouTube video",
+                "target_language": f"Language code for summary (default: en). Supported: {', '.join(SUPPORTED_LANGUAGES.keys())}",
+                "summary_length": f"Desired summary length (default: medium). Options: {', '.join(SUMMARY_LENGTHS.keys())}"
+            }
+        }
+    }
+}
+API_INFO_ETAG = hashlib.sha256(
+    json.dumps(API_INFO, sort_keys=True).encode("utf-8")
+).hexdigest()[:32]
+
 class YoutubeSummarizerView(APIView):
     """
     API view for summarizing YouTube videos with language and length support.
@@ -180,28 +209,11 @@ class YoutubeSummarizerView(APIView):
         except Exception as e:
             return self.handle_error(e)
 
+    @method_decorator(condition(etag_func=lambda request: API_INFO_ETAG))
     def get(self, request) -> Response:
         """
         Handle GET requests to provide API information.
         """
-        api_info = {
-            "name": "YouTube Video Summarizer API",
-            "version": "2.0",
-            "description": "Summarizes YouTube videos using transcripts with language and length options",
-            "supported_languages": SUPPORTED_LANGUAGES,
-            "summary_lengths": {
-                length: params['description']
-                for length, params in SUMMARY_LENGTHS.items()
-            },
-            "endpoints": {
-                "POST /api/summarize/": {
-                    "description": "Summarize a YouTube video",
-                    "parameters": {
-                        "youtube_url": "URL of the YouTube video",
-                        "target_language": f"Language code for summary (default: en). Supported: {', '.join(SUPPORTED_LANGUAGES.keys())}",
-                        "summary_length": f"Desired summary length (default: medium). Options: {', '.join(SUMMARY_LENGTHS.keys())}"
-                    }
-                }
-            }
-        }
-        return Response(api_info, status=status.HTTP_200_OK)
\ No newline at end of file
+        response = Response(API_INFO, status=status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=60 * 60)
+        return response
@@ -5,20 +5,30 @@ import "./Explore.css";
 
 const Explore = () => {
   const [videos, setVideos] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
-  // Fetch videos from backend when component mounts
+  // Fetch one page of videos; the feed is paginated with an opaque cursor
+  const fetchVideos = async (cursor = null) => {
+    const url = cursor
+      ? `http://127.0.0.1:8000/video/all/?cursor=${encodeURIComponent(cursor)}`
+      : "http://127.0.0.1:8000/video/all/";
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error("Failed to fetch videos");
+    }
+    return response.json();
+  };
+
+  // Fetch the first page from backend when component mounts
   useEffect(() => {
-    const fetchVideos = async () => {
+    const fetchFirstPage = async () => {
       try {
-        const response = await fetch("http://127.0.0.1:8000/video/all/");
-        if (!response.ok) {
-          throw new Error("Failed to fetch videos");
-        }
-        const data = await response.json();
-        console.log(data.videos); // Log the videos array from the response
+        const data = await fetchVideos();
         setVideos(data.videos); // Update state with the array of videos
+        setNextCursor(data.next_cursor);
         setLoading(false);
       } catch (err) {
         setError(err.message);
@@ -26,9 +36,21 @@ const Explore = () => {
       }
     };
 
-    fetchVideos();
+    fetchFirstPage();
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await fetchVideos(nextCursor);
+      setVideos((current) => [...current, ...data.videos]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError(err.message);
+    }
+    setLoadingMore(false);
+  };
+
   if (loading) {
     return <p>Loading...</p>;
   }
@@ -45,6 +67,15 @@ const Explore = () => {
           <VideoCard key={video.video_id} video={video} />
         ))}
       </div>
+      {nextCursor && (
+        <button
+          className="load-more"
+          onClick={loadMore}
+          disabled={loadingMore}
+        >
+          {loadingMore ? "Loading..." : "Load more"}
+        </button>
+      )}
     </>
   );
 };
@@ -21,6 +21,9 @@ import {
 } from "lucide-react";
 import "./Result.css";
 
+// Polled every 2 seconds, so feedback is given up on after 3 minutes.
+const MAX_NARRATIVE_POLLS = 90;
+
 const Result = ({
   finalScore,
   correctAnswers,
@@ -33,6 +36,8 @@ const Result = ({
   const [error, setError] = useState(null);
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [narrativeToken, setNarrativeToken] = useState(null);
+  const [narrativeStatus, setNarrativeStatus] = useState(null);
 
   const incorrectAnswers = totalQuestions - correctAnswers;
   const averageTime = Math.round(
@@ -132,10 +137,15 @@ const Result = ({
           JSON.stringify(requestData, null, 2)
         );
 
+        // Signed-in users get the attempt added to their quiz history.
+        // Anonymous users send no token, since an invalid one is rejected.
+        const token = localStorage.getItem("my-app-auth");
         const response = await fetch("http://127.0.0.1:8000/analyze-quiz/", {
           method: "POST",
+          credentials: "include", // Send cookies
           headers: {
             "Content-Type": "application/json",
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
           },
           body: JSON.stringify(requestData),
         });
@@ -153,7 +163,10 @@ const Result = ({
           throw new Error("Invalid response format from server");
         }
 
+        // Scored on the server without an LLM; detailed AI feedback is
+        // fetched separately when the user asks for it
         setAnalysis(data.data);
+        setNarrativeToken(data.narrative_token);
         setError(null);
       } catch (err) {
         console.error("Analysis fetch error details:", err);
@@ -168,6 +181,33 @@ const Result = ({
     }
   }, [quizResults]);
 
+  // Ask for the AI feedback and poll until it is ready
+  const fetchNarrative = async () => {
+    setNarrativeStatus("pending");
+    try {
+      for (let attempt = 0; attempt < MAX_NARRATIVE_POLLS; attempt++) {
+        const response = await fetch(
+          `http://127.0.0.1:8000/analyze-quiz/narrative/${narrativeToken}/`
+        );
+        const data = await response.json();
+        if (response.status === 202) {
+          await new Promise((resolve) => setTimeout(resolve, 2000));
+          continue;
+        }
+        if (!response.ok || data.status !== "ready") {
+          throw new Error(data.message || "Failed to generate feedback");
+        }
+        setAnalysis((current) => ({ ...current, ...data.data }));
+        setNarrativeStatus("ready");
+        return;
+      }
+      throw new Error("Timed out waiting for feedback");
+    } catch (err) {
+      console.error("Narrative fetch error:", err);
+      setNarrativeStatus("failed");
+    }
+  };
+
   const getProficiencyColor = (level) => {
     const colors = {
       Beginner: "#FFA726",
@@ -320,6 +360,20 @@ const Result = ({
               Detailed Performance Analysis
             </h3>
 
+            {narrativeToken && narrativeStatus !== "ready" && (
+              <button
+                className="restart-button"
+                onClick={fetchNarrative}
+                disabled={narrativeStatus === "pending"}
+              >
+                {narrativeStatus === "pending"
+                  ? "Generating AI feedback..."
+                  : narrativeStatus === "failed"
+                  ? "Retry AI feedback"
+                  : "Get AI feedback"}
+              </button>
+            )}
+
             <div className="analysis-time-management">
               <div className="analysis-card proficiency">
                 <div className="proficiency-header">